@@ -1,5 +1,6 @@
 import os
-from flask import Flask, send_from_directory, jsonify
+from datetime import timedelta
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from db import db
@@ -13,44 +14,80 @@ from models.bill_split import BillSplit
 from models.split_participant import SplitParticipant
 from models.settlement import Settlement
 from models.otp import OTP
-from dotenv import load_dotenv
-
-def create_app():
-    load_dotenv()
+from models.budget import Budget
+from models.budget_alert import BudgetAlert
+from models.goal_contribution import GoalContribution
+from models.savings_rollup import SavingsRollup
+from models.user_streak import UserStreak
+from models.goal_projection import GoalProjection
+from models.allocation_rule import AllocationRule
+from models.analytics_daily_fact import AnalyticsDailyFact
+from models.export_job import ExportJob
+from models.user_activity import UserActivity
+from models.cohort_retention import CohortRetention
+from models.fx_rate import FxRate
+from models.revoked_token import RevokedToken
+from helpers.activity import init_activity_tracking
+from helpers.cache import init_cache
+from helpers.rate_limit import init_rate_limiting
+from helpers.passwords import init_passwords
+from helpers.revocation import init_revocation
+from helpers.write_behind import init_write_behind
+from helpers.static_files import send_upload
+from helpers.db_pool import configure_engine_options
 
+def create_app(migrations=True):
+    """Build the app. Serving processes pass migrations=False to skip importing Alembic."""
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = app.config['TOKEN_EXPIRY_DAYS'] * 86400
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=app.config['ACCESS_TOKEN_EXPIRES_MINUTES'])
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=app.config['TOKEN_EXPIRY_DAYS'])
+    # Refuse oversized bodies before Werkzeug spools them; 64 KiB covers multipart headers and form fields.
+    app.config['MAX_CONTENT_LENGTH'] = app.config['MAX_UPLOAD_BYTES'] + 64 * 1024
 
-    UPLOAD_FOLDER = os.path.join('/tmp', 'Uploads')  # Use /tmp for containers
-    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
     app.config['GMAIL_ADDRESS'] = os.getenv('GMAIL_ADDRESS')
     app.config['GMAIL_APP_PASSWORD'] = os.getenv('GMAIL_APP_PASSWORD')
 
+    configure_engine_options(app)
     db.init_app(app)
-    JWTManager(app)
+    if migrations:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    init_cache(app)
+    init_rate_limiting(app)
+    init_passwords(app)
+    init_write_behind(app)
+    jwt = JWTManager(app)
+    init_revocation(app, jwt)
+    init_activity_tracking(app)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+    @app.errorhandler(413)
+    def request_too_large(e):
+        return jsonify({"success": False, "message": "Request body is too large."}), 413
+
     @app.route('/api/ping', methods=['GET'])
     def ping():
         return jsonify({'message': 'pong'}), 200
 
     register_routes(app)
 
+    @app.route('/uploads/<filename>')  # Older profile picture URLs were stored lowercase
     @app.route('/Uploads/<filename>')
     def uploaded_file(filename):
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
-
-    with app.app_context():
-        try:
-            db.create_all()
-        except Exception as e:
-            print(f"Database initialization failed: {e}")
-            # Optionally, continue without crashing
-            # raise e  # Uncomment to crash for debugging
+        return send_upload(filename)
+
+    if app.config['DB_AUTO_CREATE']:
+        with app.app_context():
+            try:
+                db.create_all()
+            except Exception as e:
+                print(f"Database initialization failed: {e}")
+                # Optionally, continue without crashing
+                # raise e  # Uncomment to crash for debugging
 
     return app
 
@@ -0,0 +1,96 @@
+"""Show how checkout waits, overflow and timeouts grow as concurrency passes the pool size.
+
+Usage: python benchmarks/db_pool_saturation.py [--url DATABASE_URI] [--pool-size 5] [--max-overflow 5]
+                                              [--timeout 2] [--hold-ms 20] [--seconds 5] [--threads 2,5,10,20,40]
+
+Each thread repeatedly checks out a connection, runs SELECT 1, holds it for
+--hold-ms to stand in for request work and returns it. Defaults to a
+throwaway SQLite file; point --url at MySQL to see real connect costs.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+from helpers.db_pool import InstrumentedQueuePool
+
+def sample(name, label):
+    return REGISTRY.get_sample_value(name, {'pool': label}) or 0
+
+def run(engine, label, threads, seconds, hold):
+    waits = []
+    timeouts = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    overflow_before = sample('smartsave_db_pool_overflow_checkouts_total', label)
+
+    def worker():
+        nonlocal timeouts
+        local_waits = []
+        local_timeouts = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    local_waits.append(time.perf_counter() - started)
+                    conn.execute(text('SELECT 1'))
+                    time.sleep(hold)
+            except exc.TimeoutError:
+                local_timeouts += 1
+        with lock:
+            waits.extend(local_waits)
+            timeouts += local_timeouts
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    waits.sort()
+    def percentile(p):
+        return waits[min(len(waits) - 1, int(len(waits) * p))] * 1000 if waits else float('nan')
+    overflow = sample('smartsave_db_pool_overflow_checkouts_total', label) - overflow_before
+    return len(waits) / elapsed, percentile(0.5), percentile(0.95), percentile(0.99), int(overflow), timeouts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=os.getenv('DATABASE_URI'))
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--max-overflow', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=2, help='pool_timeout in seconds')
+    parser.add_argument('--hold-ms', type=float, default=20, help='time each checkout holds its connection')
+    parser.add_argument('--seconds', type=float, default=5, help='duration of each step')
+    parser.add_argument('--threads', default='2,5,10,20,40', help='comma separated concurrency steps')
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pool.db')}"
+    label = 'benchmark'
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.timeout,
+        pool_pre_ping=True,
+        pool_logging_name=label
+    )
+
+    print(f"pool_size={args.pool_size} max_overflow={args.max_overflow} timeout={args.timeout}s "
+          f"hold={args.hold_ms:.0f}ms, {args.seconds:.0f}s per step")
+    print(f"{'threads':>8}{'checkouts/s':>13}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'overflow':>10}{'timeouts':>10}")
+    for threads in (int(step) for step in args.threads.split(',')):
+        rate, p50, p95, p99, overflow, timeouts = run(engine, label, threads, args.seconds, args.hold_ms / 1000)
+        print(f"{threads:>8}{rate:>13.1f}{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}{overflow:>10}{timeouts:>10}")
+    engine.dispose()
+
+if __name__ == '__main__':
+    main()
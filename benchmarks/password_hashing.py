@@ -0,0 +1,66 @@
+"""Measure login (password verify) throughput per core for each hashing scheme.
+
+Usage: python benchmarks/password_hashing.py [--seconds 5] [--threads N] [--algorithm argon2]
+
+Each scheme is hashed with PasswordService's default cost, then N request threads
+verify against it through PasswordService for a fixed time. Verifies per
+second divided by the pool size approximates login throughput per core.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+from helpers.passwords import PasswordService
+
+PASSWORD = 'Benchmark1Password'
+
+def run(service, stored, seconds, threads):
+    count = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        nonlocal count
+        done = 0
+        while time.perf_counter() < deadline:
+            service.verify(stored, PASSWORD)
+            done += 1
+        with lock:
+            count += done
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return count / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--threads', type=int, default=(os.cpu_count() or 2) * 2, help='concurrent request threads')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='password pool size')
+    parser.add_argument('--algorithm', choices=['argon2', 'bcrypt', 'pbkdf2', 'all'], default='all')
+    args = parser.parse_args()
+
+    algorithms = ['argon2', 'bcrypt', 'pbkdf2'] if args.algorithm == 'all' else [args.algorithm]
+    schemes = [('legacy pbkdf2 (werkzeug default)', 'pbkdf2', generate_password_hash(PASSWORD, method='pbkdf2:sha256'))]
+    for algorithm in algorithms:
+        service = PasswordService(algorithm=algorithm, workers=args.workers)
+        schemes.append((algorithm, algorithm, service.hash(PASSWORD)))
+
+    print(f"{args.threads} request threads, {args.workers} hashing workers, {args.seconds:.0f}s per scheme")
+    print(f"{'scheme':<34}{'logins/s':>10}{'per core':>10}{'ms/login':>10}")
+    for label, algorithm, stored in schemes:
+        service = PasswordService(algorithm=algorithm, workers=args.workers)
+        rate = run(service, stored, args.seconds, args.threads)
+        print(f"{label:<34}{rate:>10.1f}{rate / args.workers:>10.1f}{args.workers / rate * 1000:>10.1f}")
+
+if __name__ == '__main__':
+    main()
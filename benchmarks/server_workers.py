@@ -0,0 +1,140 @@
+"""Compare throughput and p99 latency of existing endpoints under each gunicorn worker model.
+
+Usage: python benchmarks/server_workers.py [--models sync,gthread,gevent] [--workers 2] [--threads 4]
+                                          [--clients 32] [--seconds 10] [--database-uri URI]
+
+For every worker model a gunicorn server is started with gunicorn.conf.py,
+a benchmark user is created, and --clients keep-alive clients cycle
+through the endpoints below for --seconds. Defaults to a throwaway SQLite
+database; pass a MySQL URI (mysql+pymysql://...) to measure real I/O waits,
+which is where threaded and gevent workers pull ahead of sync.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+ENDPOINTS = ['/api/ping', '/api/user', '/api/transactions', '/api/transactions/insights', '/api/goals']
+
+def create_token(env):
+    """Create (or reuse) the benchmark user and return an access token for it."""
+    os.environ.update(env)
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from db import db
+    from models.user import User
+
+    app = create_app()
+    with app.app_context():
+        user = User.query.filter_by(email='benchmark@example.com').first()
+        if not user:
+            user = User(name='Benchmark', email='benchmark@example.com', profession='Tester', password='Benchmark1Password')
+            db.session.add(user)
+            db.session.commit()
+        return create_access_token(identity=user.id)
+
+def wait_until_up(base_url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            requests.get(f"{base_url}/api/ping", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start in time')
+
+def run_load(base_url, token, clients, seconds):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(offset):
+        nonlocal errors
+        session = requests.Session()
+        session.headers['Authorization'] = f"Bearer {token}"
+        local_latencies = []
+        local_errors = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = session.get(base_url + ENDPOINTS[i % len(ENDPOINTS)], timeout=30)
+                if response.status_code >= 400:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - started)
+            i += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    pool = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float('nan')
+    return len(latencies) / elapsed, percentile(0.5), percentile(0.99), errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', default='sync,gthread,gevent')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='threads per gthread worker')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent HTTP clients')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--database-uri', default=os.getenv('DATABASE_URI'))
+    args = parser.parse_args()
+
+    env = {
+        'DATABASE_URI': args.database_uri or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        'DB_AUTO_CREATE': 'true',
+        'RATE_LIMIT_ENABLED': 'false',
+        'PORT': str(args.port),
+        'WEB_CONCURRENCY': str(args.workers),
+        'GUNICORN_THREADS': str(args.threads),
+        'GUNICORN_WORKER_CONNECTIONS': str(args.clients),
+        'GUNICORN_MAX_REQUESTS': '0'
+    }
+    token = create_token(env)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"{args.workers} workers, {args.threads} threads (gthread), {args.clients} clients, {args.seconds:.0f}s per model")
+    print(f"{'model':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for model in args.models.split(','):
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', os.devnull, 'wsgi:app'],
+            cwd=ROOT,
+            env={**os.environ, **env, 'GUNICORN_WORKER_CLASS': model},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_up(base_url, process)
+            rate, p50, p99, errors = run_load(base_url, token, args.clients, args.seconds)
+            print(f"{model:<10}{rate:>10.1f}{p50:>10.2f}{p99:>10.2f}{errors:>8}")
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=60)
+
+if __name__ == '__main__':
+    main()
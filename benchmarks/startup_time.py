@@ -0,0 +1,83 @@
+"""Measure cold-start time of a serving worker: importing wsgi and building the app.
+
+Usage: python benchmarks/startup_time.py [--runs 5] [--database-uri URI] [--top 15]
+
+Each variant runs in a fresh interpreter, --runs times, and reports the
+median wall time:
+- lazy, no create_all: what gunicorn does with DB_AUTO_CREATE=false
+- lazy, create_all: DB_AUTO_CREATE=true (the old default behaviour)
+- eager imports: also imports numpy, openpyxl, Pillow and Flask-Migrate up
+  front, as the app did before those imports were deferred
+Then the slowest modules still imported at startup are listed, from
+python -X importtime.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EAGER = 'import numpy, openpyxl, PIL.Image, flask_migrate; '
+VARIANTS = [
+    ('lazy, no create_all', '', 'false'),
+    ('lazy, create_all', '', 'true'),
+    ('eager imports, create_all', EAGER, 'true')
+]
+
+def time_startup(prefix, auto_create, env, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', f"{prefix}import wsgi"],
+            cwd=ROOT,
+            env={**os.environ, **env, 'DB_AUTO_CREATE': auto_create},
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def slowest_imports(env, top):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import wsgi'],
+        cwd=ROOT,
+        env={**os.environ, **env, 'DB_AUTO_CREATE': 'false'},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if '.' not in name and name not in ('wsgi', 'app'):  # package roots, wherever first imported
+            rows.append((int(cumulative) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--database-uri', default=os.getenv('DATABASE_URI'))
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    env = {'DATABASE_URI': args.database_uri or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"}
+    print(f"median of {args.runs} cold starts")
+    for label, prefix, auto_create in VARIANTS:
+        print(f"{label:<28}{time_startup(prefix, auto_create, env, args.runs):>10.1f} ms")
+
+    print("\nslowest packages imported at startup (cumulative ms)")
+    for cumulative, name in slowest_imports(env, args.top):
+        print(f"{name:<40}{cumulative:>10.1f}")
+
+if __name__ == '__main__':
+    main()
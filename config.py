@@ -6,8 +6,54 @@ load_dotenv()
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_AUTO_CREATE = os.getenv('DB_AUTO_CREATE', 'false').lower() == 'true'  # Schema comes from `flask db upgrade`; true only for throwaway local databases
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))  # Per worker process; gunicorn.conf.py sizes both to the worker model
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # Below MySQL's wait_timeout
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # If set, /metrics requires this bearer token
     SECRET_KEY = os.getenv('SECRET_KEY', 'default-secret-key')
     TOKEN_EXPIRY_DAYS = int(os.getenv('TOKEN_EXPIRY_DAYS', 7))  # Make sure token expiry is set to 7 days
+    ACCESS_TOKEN_EXPIRES_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRES_MINUTES', 15))  # Refresh tokens last TOKEN_EXPIRY_DAYS
+    REVOCATION_SYNC_SECONDS = int(os.getenv('REVOCATION_SYNC_SECONDS', 30))
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv('REVOCATION_BLOOM_CAPACITY', 10000))
+    EXPORT_FOLDER = os.getenv('EXPORT_FOLDER', os.path.join('/tmp', 'Exports'))  # Point at a shared volume when running more than one instance
+    EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', 2))
+    EXPORT_JOB_TIMEOUT = int(os.getenv('EXPORT_JOB_TIMEOUT', 1800))  # Pending/running jobs older than this are marked failed
+    EXPORT_ASYNC_ROW_THRESHOLD = int(os.getenv('EXPORT_ASYNC_ROW_THRESHOLD', 50000))
+    SQLALCHEMY_BINDS = {'analytics': os.getenv('ANALYTICS_DATABASE_URI')} if os.getenv('ANALYTICS_DATABASE_URI') else {}
+    ANALYTICS_SNAPSHOT_TTL = int(os.getenv('ANALYTICS_SNAPSHOT_TTL', 300))
+    ANALYTICS_SNAPSHOT_FULL_RELOAD = int(os.getenv('ANALYTICS_SNAPSHOT_FULL_RELOAD', 3600))
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # 'memory' or 'redis'
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_MEMORY_MAX_TTL = int(os.getenv('CACHE_MEMORY_MAX_TTL', 30))  # Memory backend invalidates per process only, so other workers lag by up to this
+    ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', 300))
+    FX_BASE_CURRENCY = os.getenv('FX_BASE_CURRENCY', 'USD')  # Currency the rates file is quoted against
+    FX_REPORTING_CURRENCY = os.getenv('FX_REPORTING_CURRENCY', 'USD')
+    FX_RATE_CACHE_TTL = int(os.getenv('FX_RATE_CACHE_TTL', 3600))
+    UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', os.path.join('/tmp', 'Uploads'))  # Use /tmp for containers
+    MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+    THUMBNAIL_SIZES = tuple(int(size) for size in os.getenv('THUMBNAIL_SIZES', '64,128,256').split(','))
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+    UPLOAD_SENDFILE = os.getenv('UPLOAD_SENDFILE', '')  # '', 'x-accel' (nginx) or 'x-sendfile' (Apache/lighttpd)
+    UPLOAD_ACCEL_PREFIX = os.getenv('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')  # nginx internal location
+    UPLOAD_CACHE_MAX_AGE = int(os.getenv('UPLOAD_CACHE_MAX_AGE', 300))  # For uploads without content-hashed names
+    WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv('WRITE_BEHIND_FLUSH_SECONDS', 5))
+    WRITE_BEHIND_MAX_ENTRIES = int(os.getenv('WRITE_BEHIND_MAX_ENTRIES', 500))
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # 'memory' (limits per worker process) or 'redis' (shared)
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', os.getenv('CACHE_REDIS_URL'))
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+    PASSWORD_HASH_ALGORITHM = os.getenv('PASSWORD_HASH_ALGORITHM', 'argon2')  # 'argon2', 'bcrypt' or 'pbkdf2'
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 2))
+    ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 19456))  # KiB
+    ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 1))
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', 600000))
+    RATE_LIMIT_PROXY_HOPS = int(os.getenv('RATE_LIMIT_PROXY_HOPS', 0))  # Trusted proxies setting X-Forwarded-For
 
     if not SQLALCHEMY_DATABASE_URI:
         raise ValueError("DATABASE_URI must be set in environment variables.")
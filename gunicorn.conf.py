@@ -0,0 +1,85 @@
+"""Gunicorn server profile: gunicorn -c gunicorn.conf.py wsgi:app
+
+GUNICORN_WORKER_CLASS picks the worker model:
+- gthread (default): WEB_CONCURRENCY processes x GUNICORN_THREADS threads.
+- gevent: WEB_CONCURRENCY processes x GUNICORN_WORKER_CONNECTIONS greenlets.
+  This relies on the pure-Python PyMySQL driver (mysql+pymysql://) so
+  queries yield to other greenlets.
+- sync: one request per process, as before.
+
+Unless DB_POOL_SIZE / DB_MAX_OVERFLOW are set, each worker's pool is sized
+so pool_size + max_overflow covers the requests it can run at once
+(threads, or worker_connections under gevent). WEB_CONCURRENCY times that
+must fit in the database's max_connections.
+"""
+import importlib
+import multiprocessing
+import os
+import shutil
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    # Patch before the app is preloaded so every lock and socket it creates is cooperative.
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 20))
+
+# Set before the app (and config.py) is imported, in the master and so in every worker.
+concurrency = {'gthread': threads, 'gevent': worker_connections}.get(worker_class, 1)
+pool_size = int(os.environ.setdefault('DB_POOL_SIZE', '5'))
+os.environ.setdefault('DB_MAX_OVERFLOW', str(max(concurrency - pool_size, 5)))
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))  # Stagger restarts across workers
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
+
+# The app defers these so CLI commands and cold starts skip them. A preloading
+# master imports them once instead, and forked workers share the pages rather
+# than each paying for the import on its first request that needs them.
+PRELOAD_MODULES = ('numpy', 'PIL.Image', 'openpyxl')
+
+def on_starting(server):
+    multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        # Stale samples from a previous run would be merged into /metrics.
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    # create_app builds the engines and their pools in the master while
+    # preloading; anything pooled there (at most db.create_all under
+    # DB_AUTO_CREATE) must not be shared with the forked worker. Give each
+    # worker fresh pools without closing sockets the master still owns.
+    from db import db
+    from wsgi import app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    from wsgi import app
+    write_behind = app.extensions.get('write_behind')
+    if write_behind:
+        write_behind.stop()
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,152 @@
+import threading
+from datetime import date, datetime, timedelta
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from db import db
+from models.cohort_retention import CohortRetention
+from models.user import User
+from models.user_activity import UserActivity
+from helpers.utils import insert_ignore
+from helpers.write_behind import get_write_behind
+
+_seen_lock = threading.Lock()
+_seen_day = None
+_seen_users = set()
+_retention_lock = threading.Lock()
+
+def record_activity(user_id, when=None):
+    """Mark a user active for the day; at most one write per user-day per process.
+
+    The user is only remembered once the row is committed, so a failed write
+    is retried on their next request.
+    """
+    global _seen_day, _seen_users
+    when = when or datetime.utcnow()
+    day = when.date()
+    with _seen_lock:
+        if _seen_day != day:
+            _seen_day, _seen_users = day, set()
+        if user_id in _seen_users:
+            return False
+
+    with db.engine.begin() as conn:
+        conn.execute(
+            insert_ignore(UserActivity.__table__),
+            {"user_id": user_id, "day": day, "first_seen_at": when, "last_seen_at": when}
+        )
+    with _seen_lock:
+        if _seen_day == day:
+            _seen_users.add(user_id)
+    return True
+
+def init_activity_tracking(app):
+    """Record the authenticated user as active, and bump their last-seen time, on every API request."""
+    @app.before_request
+    def track_activity():
+        if not request.path.startswith('/api/') or request.method == 'OPTIONS':
+            return
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            return
+        if user_id:
+            try:
+                now = datetime.utcnow()
+                record_activity(int(user_id), now)
+                get_write_behind().record_seen(int(user_id), now)
+            except Exception as e:
+                app.logger.warning(f"Failed to record activity for user {user_id}: {e}")
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+def compute_cohort_retention(weeks=12, today=None):
+    """Rebuild the signup-week x weeks-since retention matrix with array math."""
+    import numpy as np  # Deferred so request workers that never rebuild retention skip numpy
+    today = today or date.today()
+    origin = week_start(today) - timedelta(weeks=weeks - 1)
+    origin_dt = datetime.combine(origin, datetime.min.time())
+
+    users = db.session.query(User.id, User.created_at).filter(User.created_at >= origin_dt).all()
+    activity = db.session.query(UserActivity.user_id, UserActivity.day).join(
+        User, User.id == UserActivity.user_id
+    ).filter(
+        User.created_at >= origin_dt,
+        UserActivity.day >= origin
+    ).all()
+
+    origin64 = np.datetime64(origin, 'D')
+    user_ids = np.fromiter((u[0] for u in users), dtype=np.int64, count=len(users))
+    signup_days = np.array([u[1].date() for u in users], dtype='datetime64[D]')
+    cohorts = ((signup_days - origin64).astype(np.int64) // 7) if len(users) else np.empty(0, dtype=np.int64)
+
+    order = np.argsort(user_ids)
+    user_ids, cohorts = user_ids[order], cohorts[order]
+    sizes = np.bincount(cohorts, minlength=weeks)[:weeks] if len(cohorts) else np.zeros(weeks, dtype=np.int64)
+
+    active = np.zeros((weeks, weeks), dtype=np.int64)
+    if activity and len(user_ids):
+        act_users = np.fromiter((a[0] for a in activity), dtype=np.int64, count=len(activity))
+        act_weeks = (np.array([a[1] for a in activity], dtype='datetime64[D]') - origin64).astype(np.int64) // 7
+        idx = np.clip(np.searchsorted(user_ids, act_users), 0, len(user_ids) - 1)
+        known = user_ids[idx] == act_users
+        act_cohorts = cohorts[idx[known]]
+        offsets = act_weeks[known] - act_cohorts
+        valid = (offsets >= 0) & (offsets < weeks) & (act_cohorts < weeks)
+        # Count each user once per week offset.
+        pairs = np.unique(np.stack([act_users[known][valid], act_cohorts[valid], offsets[valid]], axis=1), axis=0)
+        if len(pairs):
+            np.add.at(active, (pairs[:, 1], pairs[:, 2]), 1)
+
+    computed_at = datetime.utcnow()
+    rows = []
+    for cohort in range(weeks):
+        cohort_week = origin + timedelta(weeks=cohort)
+        for offset in range(weeks - cohort):
+            rows.append(CohortRetention(
+                cohort_week=cohort_week,
+                week_offset=offset,
+                cohort_size=int(sizes[cohort]),
+                active_users=int(active[cohort, offset]),
+                computed_at=computed_at
+            ))
+
+    # INSERT IGNORE so a concurrent rebuild in another process can't collide on the key.
+    CohortRetention.query.delete()
+    db.session.execute(insert_ignore(CohortRetention.__table__), [
+        {column.name: getattr(row, column.name) for column in CohortRetention.__table__.columns}
+        for row in rows
+    ])
+    db.session.commit()
+    return rows
+
+def retention_matrix(max_age=timedelta(hours=24), weeks=12):
+    """Return the cached retention matrix, recomputing it when older than max_age.
+
+    The compute-retention command is meant to keep it fresh. Requests only
+    recompute a stale matrix one thread per process at a time; the others
+    keep serving the stale rows instead of queueing behind the rebuild.
+    """
+    rows = CohortRetention.query.order_by(CohortRetention.cohort_week, CohortRetention.week_offset).all()
+    if not rows or datetime.utcnow() - rows[0].computed_at > max_age:
+        if _retention_lock.acquire(blocking=not rows):
+            try:
+                rows = compute_cohort_retention(weeks)
+            finally:
+                _retention_lock.release()
+
+    cohorts = {}
+    for row in rows:
+        cohort = cohorts.setdefault(row.cohort_week, {
+            "cohort_week": row.cohort_week.strftime('%Y-%m-%d'),
+            "cohort_size": row.cohort_size,
+            "active_users": [],
+            "retention": []
+        })
+        cohort["active_users"].append(row.active_users)
+        cohort["retention"].append(round(row.active_users / row.cohort_size * 100, 1) if row.cohort_size else 0.0)
+    return {
+        "computed_at": rows[0].computed_at.strftime('%Y-%m-%d %H:%M:%S') if rows else None,
+        "cohorts": list(cohorts.values())
+    }
@@ -0,0 +1,59 @@
+from sqlalchemy import case, update
+from db import db
+from models.allocation_rule import AllocationRule
+from models.savings_goal import SavingsGoal
+from helpers.savings import record_contributions
+
+def plan_allocations(rules, goals_by_id, amount):
+    """Split an income amount across goals following rules in priority order.
+
+    Each allocation is capped by the income left to allocate and by the room
+    remaining before the goal reaches its target.
+    """
+    available = float(amount)
+    plan = {}
+    for rule in rules:
+        goal = goals_by_id.get(rule.goal_id)
+        if not goal or available <= 0:
+            continue
+        wanted = float(amount) * rule.value / 100 if rule.kind == 'percent' else rule.value
+        room = max(goal.target - goal.progress - plan.get(goal.id, 0.0), 0.0)
+        allocated = round(min(wanted, available, room), 2)
+        if allocated > 0:
+            plan[goal.id] = plan.get(goal.id, 0.0) + allocated
+            available -= allocated
+    return plan
+
+def apply_income_allocations(user_id, amount):
+    """Apply the user's allocation rules to an income with one bulk UPDATE.
+
+    The affected goal rows are locked for the rest of the caller's
+    transaction so concurrent goal edits cannot interleave.
+    """
+    rules = AllocationRule.query.filter_by(user_id=user_id).order_by(
+        AllocationRule.priority, AllocationRule.id
+    ).all()
+    if not rules:
+        return {}
+
+    goals = SavingsGoal.query.filter(
+        SavingsGoal.user_id == user_id,
+        SavingsGoal.id.in_({rule.goal_id for rule in rules})
+    ).with_for_update().all()
+    plan = plan_allocations(rules, {goal.id: goal for goal in goals}, amount)
+    if not plan:
+        return {}
+
+    db.session.execute(
+        update(SavingsGoal).where(
+            SavingsGoal.user_id == user_id,
+            SavingsGoal.id.in_(plan.keys())
+        ).values(
+            progress=SavingsGoal.progress + case(plan, value=SavingsGoal.id, else_=0.0)
+        ).execution_options(synchronize_session=False)
+    )
+    for goal in goals:
+        if goal.id in plan:
+            db.session.expire(goal, ['progress'])
+    record_contributions(user_id, plan.items())
+    return plan
@@ -0,0 +1,234 @@
+from datetime import date, timedelta
+from db import db
+from models.analytics_daily_fact import AnalyticsDailyFact
+from models.goal_contribution import GoalContribution
+from models.transaction import Transaction
+from models.user import User
+from helpers.budgets import to_date
+from helpers.cache import invalidate_on_commit
+from helpers.utils import period_start, insert_increment, insert_or_update
+
+def transaction_fact(transaction):
+    """Capture the cube key and amount a transaction contributes."""
+    if transaction is None:
+        return None
+    user = db.session.get(User, transaction.user_id)
+    profession = (user.profession or '') if user else ''
+    key = (to_date(transaction.date), transaction.type, transaction.category or '', profession)
+    return key, float(transaction.amount)
+
+def apply_fact_change(before, after):
+    """Move a transaction's contribution in the cube from its old key to its new one."""
+    deltas = {}
+    for fact, sign in ((before, -1), (after, 1)):
+        if fact:
+            key, amount = fact
+            total, count = deltas.get(key, (0.0, 0))
+            deltas[key] = (total + sign * amount, count + sign)
+    upsert_facts({key: delta for key, delta in deltas.items() if delta != (0.0, 0)})
+
+def record_savings_fact(user_id, day, amount, count):
+    """Add goal contributions to the cube as 'savings' facts."""
+    user = db.session.get(User, user_id)
+    profession = (user.profession or '') if user else ''
+    upsert_facts({(day, 'savings', '', profession): (float(amount), count)})
+
+def upsert_facts(deltas):
+    """Increment cube rows by (amount, count) deltas, creating missing rows.
+
+    One INSERT ... ON DUPLICATE KEY UPDATE per batch, so concurrent first
+    writes to a cell add up instead of colliding on the unique key. Keys are
+    sorted so concurrent batches lock rows in the same order.
+    """
+    if not deltas:
+        return
+    invalidate_on_commit('financial')
+    db.session.execute(
+        insert_increment(AnalyticsDailyFact.__table__, ('day', 'type', 'category', 'profession'), ('total_amount', 'txn_count')),
+        [
+            {
+                "day": day,
+                "type": type_,
+                "category": category,
+                "profession": profession,
+                "total_amount": amount,
+                "txn_count": count
+            }
+            for (day, type_, category, profession), (amount, count) in sorted(deltas.items())
+        ]
+    )
+
+def move_profession_facts(user_id, old_profession, new_profession):
+    """Move a user's transactions and contributions between profession cells.
+
+    The cube is keyed by the profession at write time; call this in the same
+    transaction as a profession change so existing cells follow the user.
+    """
+    old_profession = old_profession or ''
+    new_profession = new_profession or ''
+    if old_profession == new_profession:
+        return
+    transactions = db.session.query(
+        Transaction.date,
+        Transaction.type,
+        db.func.coalesce(Transaction.category, ''),
+        db.func.sum(Transaction.amount),
+        db.func.count(Transaction.my_row_id)
+    ).filter(
+        Transaction.user_id == user_id
+    ).group_by(
+        Transaction.date, Transaction.type, Transaction.category
+    ).all()
+    contribution_day = db.func.date(GoalContribution.created_at)
+    contributions = db.session.query(
+        contribution_day,
+        db.func.sum(GoalContribution.amount),
+        db.func.count(GoalContribution.id)
+    ).filter(
+        GoalContribution.user_id == user_id,
+        GoalContribution.backfilled.is_(False)
+    ).group_by(
+        contribution_day
+    ).all()
+
+    cells = [((to_date(day), type_, category), float(total), int(count)) for day, type_, category, total, count in transactions]
+    cells += [((to_date(day), 'savings', ''), float(total), int(count)) for day, total, count in contributions]
+    deltas = {}
+    for (day, type_, category), total, count in cells:
+        deltas[(day, type_, category, old_profession)] = (-total, -count)
+        deltas[(day, type_, category, new_profession)] = (total, count)
+    upsert_facts(deltas)
+
+def rebuild_cube(window_days=31):
+    """Rebuild the whole cube from transactions and contributions, one window at a time.
+
+    Each window is rewritten in place in its own transaction: its cells are
+    zeroed (locking them against live increments), recomputed and upserted
+    with absolute values, so reports keep reading the old cells until the
+    window commits and the table is never empty mid-rebuild.
+    """
+    first_day, last_day = db.session.query(db.func.min(Transaction.date), db.func.max(Transaction.date)).one()
+    first_contribution = db.session.query(db.func.min(GoalContribution.created_at)).filter(
+        GoalContribution.backfilled.is_(False)
+    ).scalar()
+    if first_day:
+        first_day = to_date(first_day)
+    if first_contribution and (not first_day or first_contribution.date() < first_day):
+        first_day = first_contribution.date()
+
+    fact = AnalyticsDailyFact
+    if not first_day:
+        fact.query.delete()
+        invalidate_on_commit('financial')
+        db.session.commit()
+        return 0
+
+    profession = db.func.coalesce(User.profession, '')
+    contribution_day = db.func.date(GoalContribution.created_at)
+    rows_written = 0
+    start = first_day
+    end_of_data = max(to_date(last_day), date.today()) + timedelta(days=1) if last_day else date.today() + timedelta(days=1)
+    while start < end_of_data:
+        end = start + timedelta(days=window_days)
+        in_window = (fact.day >= start, fact.day < end)
+        fact.query.filter(*in_window).update({fact.total_amount: 0.0, fact.txn_count: 0}, synchronize_session=False)
+        transactions = db.session.query(
+            Transaction.date,
+            Transaction.type,
+            db.func.coalesce(Transaction.category, ''),
+            profession,
+            db.func.sum(Transaction.amount),
+            db.func.count(Transaction.my_row_id)
+        ).join(
+            User, User.id == Transaction.user_id
+        ).filter(
+            Transaction.date >= start,
+            Transaction.date < end
+        ).group_by(
+            Transaction.date, Transaction.type, Transaction.category, profession
+        ).all()
+        contributions = db.session.query(
+            contribution_day,
+            profession,
+            db.func.sum(GoalContribution.amount),
+            db.func.count(GoalContribution.id)
+        ).join(
+            User, User.id == GoalContribution.user_id
+        ).filter(
+            GoalContribution.created_at >= start,
+            GoalContribution.created_at < end,
+            GoalContribution.backfilled.is_(False)
+        ).group_by(
+            contribution_day, profession
+        ).all()
+
+        facts = [
+            {"day": to_date(day), "type": type_, "category": category, "profession": prof, "total_amount": float(total), "txn_count": int(count)}
+            for day, type_, category, prof, total, count in transactions
+        ] + [
+            {"day": to_date(day), "type": 'savings', "category": '', "profession": prof, "total_amount": float(total), "txn_count": int(count)}
+            for day, prof, total, count in contributions
+        ]
+        if facts:
+            db.session.execute(
+                insert_or_update(fact.__table__, ('day', 'type', 'category', 'profession'), ('total_amount', 'txn_count')),
+                sorted(facts, key=lambda row: (row["day"], row["type"], row["category"], row["profession"]))
+            )
+        fact.query.filter(*in_window, fact.txn_count == 0).delete(synchronize_session=False)
+        invalidate_on_commit('financial')
+        db.session.commit()
+        rows_written += len(facts)
+        start = end
+    fact.query.filter(db.or_(fact.day < first_day, fact.day >= end_of_data)).delete(synchronize_session=False)
+    invalidate_on_commit('financial')
+    db.session.commit()
+    return rows_written
+
+REPORT_SPECS = {
+    'spendingTrends': (('expense',), 'category', 'amount'),
+    'savings': (('savings',), 'profession', 'amount'),
+    'transactionVolume': (('income', 'expense'), 'category', 'count'),
+    'professionSpending': (('expense',), 'profession', 'amount'),
+}
+
+def report_query(report_type, date_from, date_to=None, by_day=False):
+    """Build the grouped cube query behind a report: ([day,] dimension, measure)."""
+    fact = AnalyticsDailyFact
+    types, dimension_name, measure_name = REPORT_SPECS[report_type]
+    dimension = fact.category if dimension_name == 'category' else fact.profession
+    measure = db.func.sum(fact.txn_count) if measure_name == 'count' else db.func.sum(fact.total_amount)
+
+    keys = [fact.day, dimension] if by_day else [dimension]
+    query = db.session.query(*keys, measure).filter(
+        fact.type.in_(types),
+        fact.day >= date_from
+    )
+    if date_to:
+        query = query.filter(fact.day <= date_to)
+    # Cells netted to zero by edits and deletes stay in the cube; keep them out of reports.
+    return query.group_by(*keys).having(db.func.sum(fact.txn_count) > 0).order_by(*keys)
+
+def financial_report(report_type, date_from, date_to=None, granularity=None):
+    """Answer a financial report from the cube, optionally bucketed by period."""
+    if report_type not in REPORT_SPECS:
+        return None
+    _, dimension_name, measure_name = REPORT_SPECS[report_type]
+    cast = int if measure_name == 'count' else float
+
+    def label(value):
+        return value if value or dimension_name == 'category' else "Unknown"
+
+    if not granularity:
+        return [
+            {dimension_name: label(dimension), measure_name: cast(measure)}
+            for dimension, measure in report_query(report_type, date_from, date_to).all()
+        ]
+
+    buckets = {}
+    for day, dimension, measure in report_query(report_type, date_from, date_to, by_day=True).all():
+        key = (period_start(granularity, to_date(day)).strftime('%Y-%m-%d'), label(dimension))
+        buckets[key] = buckets.get(key, 0) + measure
+    return [
+        {"period": period, dimension_name: dimension, measure_name: cast(measure)}
+        for (period, dimension), measure in sorted(buckets.items())
+    ]
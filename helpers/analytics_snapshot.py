@@ -0,0 +1,304 @@
+import copy
+import threading
+import time
+import numpy as np
+from sqlalchemy import select
+from db import db
+from models.savings_goal import SavingsGoal
+from models.transaction import Transaction
+from models.user import User
+
+TYPE_CODES = {'income': 0, 'expense': 1}
+TYPE_NAMES = ('income', 'expense')
+METRICS = ('count', 'sum', 'mean', 'min', 'max', 'p50', 'p90', 'p99')
+GROUP_KEYS = ('category', 'profession', 'type', 'month', 'day')
+CHUNK_ROWS = 50000
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+class _Vocabulary:
+    """Map strings to dense integer codes for categorical columns."""
+
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def encode(self, values):
+        codes = self.codes
+        out = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(self.names)
+                self.names.append(value)
+            out[i] = code
+        return out
+
+    def lookup(self, name):
+        return self.codes.get(name, -1)
+
+def _days(dates):
+    return (np.array(dates, dtype='datetime64[D]') - _EPOCH).astype(np.int32)
+
+def _day_label(day):
+    return str(_EPOCH + np.timedelta64(int(day), 'D'))
+
+class AnalyticsSnapshot:
+    """Compact columnar copy of transactions, goals and user attributes.
+
+    Transactions are appended incrementally past a my_row_id high-water mark;
+    a periodic full reload picks up rows that were edited or deleted.
+    """
+
+    def __init__(self):
+        self.categories = _Vocabulary()
+        self.professions = _Vocabulary()
+        self.high_water_mark = 0
+        self.loaded_at = 0.0
+        self.full_loaded_at = 0.0
+        self._reset_transactions()
+        self.goal_user_ids = np.empty(0, dtype=np.int32)
+        self.goal_targets = np.empty(0, dtype=np.float32)
+        self.goal_progress = np.empty(0, dtype=np.float32)
+        self.goal_deadlines = np.empty(0, dtype=np.int32)
+        self.user_ids = np.empty(0, dtype=np.int32)
+        self.user_professions = np.empty(0, dtype=np.int32)
+
+    def _reset_transactions(self):
+        self.high_water_mark = 0
+        self.txn_user_ids = np.empty(0, dtype=np.int32)
+        self.txn_days = np.empty(0, dtype=np.int32)
+        self.txn_amounts = np.empty(0, dtype=np.float32)
+        self.txn_categories = np.empty(0, dtype=np.int32)
+        self.txn_types = np.empty(0, dtype=np.int8)
+
+    def refresh(self, engine, full=False):
+        """Load users and goals, then append transactions past the high-water mark."""
+        with engine.connect() as conn:
+            self._load_users(conn)
+            self._load_goals(conn)
+            if full:
+                self._reset_transactions()
+                self.full_loaded_at = time.time()
+            self._load_transactions(conn)
+        self.loaded_at = time.time()
+
+    def _load_users(self, conn):
+        rows = conn.execute(select(User.id, User.profession).order_by(User.id)).all()
+        self.user_ids = np.fromiter((r[0] for r in rows), dtype=np.int32, count=len(rows))
+        self.user_professions = self.professions.encode([r[1] or 'Unknown' for r in rows])
+
+    def _load_goals(self, conn):
+        rows = conn.execute(select(SavingsGoal.user_id, SavingsGoal.target, SavingsGoal.progress, SavingsGoal.deadline)).all()
+        self.goal_user_ids = np.fromiter((r[0] or 0 for r in rows), dtype=np.int32, count=len(rows))
+        self.goal_targets = np.fromiter((r[1] for r in rows), dtype=np.float32, count=len(rows))
+        self.goal_progress = np.fromiter((r[2] for r in rows), dtype=np.float32, count=len(rows))
+        self.goal_deadlines = _days([r[3] for r in rows]) if rows else np.empty(0, dtype=np.int32)
+
+    def _load_transactions(self, conn):
+        result = conn.execution_options(stream_results=True).execute(
+            select(
+                Transaction.my_row_id, Transaction.user_id, Transaction.date,
+                Transaction.amount, Transaction.category, Transaction.type
+            ).where(
+                Transaction.my_row_id > self.high_water_mark
+            ).order_by(Transaction.my_row_id)
+        )
+        chunks = []
+        while True:
+            rows = result.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            chunks.append((
+                np.fromiter((r[1] for r in rows), dtype=np.int32, count=len(rows)),
+                _days([r[2] for r in rows]),
+                np.fromiter((r[3] for r in rows), dtype=np.float32, count=len(rows)),
+                self.categories.encode([r[4] for r in rows]),
+                np.fromiter((TYPE_CODES.get(r[5], -1) for r in rows), dtype=np.int8, count=len(rows)),
+            ))
+            self.high_water_mark = rows[-1][0]
+        if chunks:
+            self.txn_user_ids = np.concatenate([self.txn_user_ids] + [c[0] for c in chunks])
+            self.txn_days = np.concatenate([self.txn_days] + [c[1] for c in chunks])
+            self.txn_amounts = np.concatenate([self.txn_amounts] + [c[2] for c in chunks])
+            self.txn_categories = np.concatenate([self.txn_categories] + [c[3] for c in chunks])
+            self.txn_types = np.concatenate([self.txn_types] + [c[4] for c in chunks])
+
+    def _professions_for(self, user_ids):
+        """Vectorized user_id -> profession code join; unknown users map to -1."""
+        if not len(self.user_ids):
+            return np.full(len(user_ids), -1, dtype=np.int32)
+        idx = np.searchsorted(self.user_ids, user_ids)
+        idx = np.clip(idx, 0, len(self.user_ids) - 1)
+        return np.where(self.user_ids[idx] == user_ids, self.user_professions[idx], -1)
+
+    def transaction_mask(self, type=None, category=None, profession=None, day_from=None, day_to=None):
+        """Build a boolean row mask for the given filters."""
+        mask = np.ones(len(self.txn_amounts), dtype=bool)
+        if type:
+            mask &= self.txn_types == TYPE_CODES.get(type, -2)
+        if category:
+            mask &= self.txn_categories == self.categories.lookup(category)
+        if profession:
+            mask &= self._professions_for(self.txn_user_ids) == self.professions.lookup(profession)
+        if day_from is not None:
+            mask &= self.txn_days >= _days([day_from])[0]
+        if day_to is not None:
+            mask &= self.txn_days <= _days([day_to])[0]
+        return mask
+
+    def _group_codes(self, group_by, mask):
+        if group_by == 'category':
+            return self.txn_categories[mask], lambda code: self.categories.names[code]
+        if group_by == 'profession':
+            codes = self._professions_for(self.txn_user_ids[mask])
+            return codes, lambda code: self.professions.names[code] if code >= 0 else 'Unknown'
+        if group_by == 'type':
+            return self.txn_types[mask].astype(np.int32), lambda code: TYPE_NAMES[code] if code >= 0 else 'other'
+        if group_by == 'month':
+            months = (_EPOCH + self.txn_days[mask].astype('timedelta64[D]')).astype('datetime64[M]')
+            codes = months.astype(np.int32)
+            return codes, lambda code: str(np.datetime64(int(code), 'M'))
+        if group_by == 'day':
+            return self.txn_days[mask], _day_label
+        raise ValueError(f"Invalid group_by: {group_by}")
+
+    def query_transactions(self, filters, group_by=None, metrics=('count', 'sum')):
+        """Filter, group and summarize transaction amounts."""
+        mask = self.transaction_mask(**filters)
+        amounts = self.txn_amounts[mask].astype(np.float64)
+        if not group_by:
+            return [dict(_summarize(amounts, metrics))]
+
+        codes, label = self._group_codes(group_by, mask)
+        order = np.argsort(codes, kind='stable')
+        codes, amounts = codes[order], amounts[order]
+        keys, starts = np.unique(codes, return_index=True)
+        bounds = np.append(starts, len(codes))
+        results = []
+        for i, key in enumerate(keys):
+            row = {group_by: label(key)}
+            row.update(_summarize(amounts[bounds[i]:bounds[i + 1]], metrics))
+            results.append(row)
+        return results
+
+    def distributions(self, filters, group_by='category', percentiles=(50, 90, 99), bins=20, top=5):
+        """Per-group amount distributions: percentiles, a histogram and the top-N rows."""
+        mask = self.transaction_mask(**filters)
+        row_ids = np.flatnonzero(mask)
+        codes, label = self._group_codes(group_by, mask)
+        order = np.argsort(codes, kind='stable')
+        codes, row_ids = codes[order], row_ids[order]
+        keys, starts = np.unique(codes, return_index=True)
+        bounds = np.append(starts, len(codes))
+
+        results = []
+        for i, key in enumerate(keys):
+            rows = row_ids[bounds[i]:bounds[i + 1]]
+            amounts = self.txn_amounts[rows].astype(np.float64)
+            counts, edges = np.histogram(amounts, bins=bins)
+            top_n = min(top, len(rows))
+            top_idx = np.argpartition(-amounts, top_n - 1)[:top_n] if top_n else np.empty(0, dtype=np.int64)
+            top_idx = top_idx[np.argsort(-amounts[top_idx])]
+            results.append({
+                group_by: label(key),
+                "count": int(len(amounts)),
+                "sum": round(float(amounts.sum()), 2),
+                "mean": round(float(amounts.mean()), 2),
+                "percentiles": {
+                    f"p{p}": round(float(v), 2)
+                    for p, v in zip(percentiles, np.percentile(amounts, percentiles))
+                },
+                "histogram": {
+                    "edges": [round(float(e), 2) for e in edges],
+                    "counts": counts.tolist()
+                },
+                "top": [
+                    {
+                        "amount": round(float(amounts[j]), 2),
+                        "user_id": int(self.txn_user_ids[rows[j]]),
+                        "date": _day_label(self.txn_days[rows[j]])
+                    }
+                    for j in top_idx
+                ]
+            })
+        return results
+
+    def goal_summary(self, group_by='profession'):
+        """Summarize goal targets and completion, grouped by profession or overall."""
+        completion = np.divide(
+            self.goal_progress, self.goal_targets,
+            out=np.zeros(len(self.goal_targets), dtype=np.float32),
+            where=self.goal_targets > 0
+        )
+        if group_by != 'profession':
+            return [_goal_stats(self.goal_targets, self.goal_progress, completion)]
+
+        codes = self._professions_for(self.goal_user_ids)
+        results = []
+        for code in np.unique(codes):
+            selected = codes == code
+            row = {"profession": self.professions.names[code] if code >= 0 else 'Unknown'}
+            row.update(_goal_stats(self.goal_targets[selected], self.goal_progress[selected], completion[selected]))
+            results.append(row)
+        return results
+
+def _summarize(values, metrics):
+    if not len(values):
+        return {metric: 0 for metric in metrics}
+    stats = {}
+    percentiles = [m for m in metrics if m.startswith('p')]
+    if percentiles:
+        computed = np.percentile(values, [int(m[1:]) for m in percentiles])
+        stats.update({m: round(float(v), 2) for m, v in zip(percentiles, computed)})
+    for metric in metrics:
+        if metric == 'count':
+            stats['count'] = int(len(values))
+        elif metric == 'sum':
+            stats['sum'] = round(float(values.sum()), 2)
+        elif metric == 'mean':
+            stats['mean'] = round(float(values.mean()), 2)
+        elif metric == 'min':
+            stats['min'] = round(float(values.min()), 2)
+        elif metric == 'max':
+            stats['max'] = round(float(values.max()), 2)
+    return stats
+
+def _goal_stats(targets, progress, completion):
+    return {
+        "goals": int(len(targets)),
+        "total_target": round(float(targets.sum(dtype=np.float64)), 2),
+        "total_progress": round(float(progress.sum(dtype=np.float64)), 2),
+        "completed": int((completion >= 1).sum()),
+        "median_completion": round(float(np.median(completion)), 3) if len(completion) else 0
+    }
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+def get_snapshot(app):
+    """Return the process-wide snapshot, refreshing it when stale.
+
+    Only one thread refreshes at a time; others keep reading the previous
+    snapshot instead of queueing behind the load.
+    """
+    global _snapshot
+    ttl = app.config['ANALYTICS_SNAPSHOT_TTL']
+    full_interval = app.config['ANALYTICS_SNAPSHOT_FULL_RELOAD']
+    now = time.time()
+    if _snapshot is not None and now - _snapshot.loaded_at < ttl:
+        return _snapshot
+
+    blocking = _snapshot is None
+    if not _snapshot_lock.acquire(blocking=blocking):
+        return _snapshot
+    try:
+        if _snapshot is None or now - _snapshot.loaded_at >= ttl:
+            engine = db.engines['analytics'] if 'analytics' in db.engines else db.engine
+            # Refresh a shallow copy so readers never see half-swapped arrays.
+            snapshot = copy.copy(_snapshot) if _snapshot else AnalyticsSnapshot()
+            snapshot.refresh(engine, full=now - snapshot.full_loaded_at >= full_interval)
+            _snapshot = snapshot
+        return _snapshot
+    finally:
+        _snapshot_lock.release()
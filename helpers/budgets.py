@@ -0,0 +1,131 @@
+from datetime import date, datetime, timedelta
+from db import db
+from models.budget import Budget
+from models.budget_alert import BudgetAlert
+from models.transaction import Transaction
+
+def to_date(value):
+    """Coerce a request date ('YYYY-MM-DD' string, datetime or date) to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+def period_bounds(period, day):
+    """Return the [start, end) dates of the budget period containing day."""
+    if period == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+def expense_snapshot(transaction):
+    """Capture the budget-relevant fields of an expense, or None for other types."""
+    if transaction is None or transaction.type != 'expense':
+        return None
+    return (transaction.category, to_date(transaction.date), float(transaction.amount))
+
+def roll_budget(budget, today=None, force=False):
+    """Move a budget into the current period.
+
+    Spend is recounted with a single bounded SUM only when the period changes
+    (or when seeding a new budget), so steady-state reads and writes never
+    aggregate over transactions.
+    """
+    start, end = period_bounds(budget.period, today or date.today())
+    if budget.period_start == start and not force:
+        return False
+
+    spent = db.session.query(db.func.sum(Transaction.amount)).filter(
+        Transaction.user_id == budget.user_id,
+        Transaction.category == budget.category,
+        Transaction.type == 'expense',
+        Transaction.date >= start,
+        Transaction.date < end
+    ).scalar() or 0.0
+    budget.period_start = start
+    budget.spent = float(spent)
+    budget.alert_level = 0.0
+    return True
+
+def apply_expense_change(user_id, before, after, today=None):
+    """Apply the spend delta between two expense snapshots to the user's budgets.
+
+    Returns the budgets whose spend may have moved so callers can check them
+    for threshold crossings in one batch.
+    """
+    deltas = {}
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot:
+            category, day, amount = snapshot
+            deltas.setdefault(category, []).append((day, sign * amount))
+    if not deltas:
+        return []
+
+    db.session.flush()
+    budgets = Budget.query.filter(
+        Budget.user_id == user_id,
+        Budget.category.in_(deltas.keys())
+    ).all()
+
+    touched = []
+    for budget in budgets:
+        if roll_budget(budget, today):
+            # The recount already sees the flushed transaction change.
+            touched.append(budget)
+            continue
+        start, end = period_bounds(budget.period, budget.period_start)
+        delta = sum(amount for day, amount in deltas[budget.category] if start <= day < end)
+        if delta:
+            budget.spent = Budget.spent + delta
+            touched.append(budget)
+
+    db.session.flush()
+    return touched
+
+def queue_budget_alerts(budgets):
+    """Queue alerts for budgets that crossed their warning or limit threshold."""
+    alerts = []
+    for budget in budgets:
+        limit = float(budget.limit)
+        spent = float(budget.spent)
+        if spent >= limit:
+            level = 1.0
+        elif spent >= limit * budget.alert_threshold:
+            level = budget.alert_threshold
+        else:
+            level = 0.0
+
+        if level > budget.alert_level:
+            alerts.append(BudgetAlert(
+                budget_id=budget.id,
+                user_id=budget.user_id,
+                category=budget.category,
+                level='exceeded' if level >= 1.0 else 'warning',
+                spent=spent,
+                limit=limit,
+                period_start=budget.period_start
+            ))
+        if level != budget.alert_level:
+            budget.alert_level = level
+
+    if alerts:
+        db.session.add_all(alerts)
+    return alerts
+
+def sweep_budget_alerts(batch_size=500, today=None):
+    """Roll every budget into the current period and queue pending alerts in batches."""
+    queued = 0
+    last_id = 0
+    while True:
+        batch = Budget.query.filter(Budget.id > last_id).order_by(Budget.id).limit(batch_size).all()
+        if not batch:
+            break
+        for budget in batch:
+            roll_budget(budget, today)
+        queued += len(queue_budget_alerts(batch))
+        last_id = batch[-1].id
+        db.session.commit()
+    return queued
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event
+from db import db
+
+_listeners_installed = False
+
+class LRUCache:
+    """In-process LRU cache with per-entry TTLs.
+
+    Each worker process has its own copy, and invalidations only bump this
+    process's namespace versions, so other workers keep serving their entries
+    until they expire. max_ttl caps every entry's lifetime to bound that
+    staleness; use the Redis backend where writes must be visible at once.
+    """
+
+    def __init__(self, max_entries=1024, clock=time.monotonic, max_ttl=None):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.max_ttl = max_ttl
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        if self.max_ttl:
+            ttl = min(ttl, self.max_ttl) if ttl else self.max_ttl
+        with self._lock:
+            self._data[key] = (value, self.clock() + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        # Counters live outside the LRU so a namespace version is never evicted.
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+class RedisCache:
+    """Redis-backed cache storing JSON values, shared by all workers."""
+
+    def __init__(self, url, prefix='smartsave:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+def init_cache(app):
+    """Attach the configured result cache and commit-driven invalidation to the app."""
+    if app.config['CACHE_BACKEND'] == 'redis' and app.config['CACHE_REDIS_URL']:
+        cache = RedisCache(app.config['CACHE_REDIS_URL'])
+    else:
+        cache = LRUCache(app.config['CACHE_MAX_ENTRIES'], max_ttl=app.config['CACHE_MEMORY_MAX_TTL'])
+    app.extensions['result_cache'] = cache
+
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(db.session, 'after_commit', _invalidate_after_commit)
+        event.listen(db.session, 'after_rollback', _discard_pending_invalidations)
+        _listeners_installed = True
+    return cache
+
+def get_cache():
+    return current_app.extensions['result_cache']
+
+def _namespace_version(cache, namespace):
+    return cache.counter(f"version:{namespace}")
+
+def cached_result(namespace, params, compute, ttl=None):
+    """Return compute() cached under the namespace's current version and params."""
+    cache = get_cache()
+    ttl = ttl or current_app.config['ANALYTICS_CACHE_TTL']
+    normalized = json.dumps(params, sort_keys=True, default=str)
+    key = f"result:{namespace}:{_namespace_version(cache, namespace)}:{normalized}"
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, ttl)
+    return result
+
+def invalidate(namespace):
+    """Retire every cached result in a namespace.
+
+    Immediate for every worker with the Redis backend; with the in-memory
+    backend only this process sees it and other workers expire on TTL.
+    """
+    get_cache().incr(f"version:{namespace}")
+
+def invalidate_on_commit(*namespaces):
+    """Retire cached results once the current transaction commits."""
+    db.session.info.setdefault('invalidate_namespaces', set()).update(namespaces)
+
+def _invalidate_after_commit(session):
+    namespaces = session.info.pop('invalidate_namespaces', None)
+    cache = current_app.extensions.get('result_cache') if namespaces else None
+    if cache:
+        for namespace in namespaces:
+            cache.incr(f"version:{namespace}")
+
+def _discard_pending_invalidations(session):
+    session.info.pop('invalidate_namespaces', None)
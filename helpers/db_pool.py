@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from helpers.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_IN_USE, DB_POOL_OVERFLOW_CHECKOUTS, DB_POOL_TIMEOUTS
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports checkout waits, in-use connections, overflow and timeouts.
+
+    Metrics are labelled with the pool's logging name, which engine_options
+    sets to the bind key so the default and analytics engines stay apart.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.metrics_label = kw.get('logging_name') or 'default'
+        self._checkout = threading.local()
+
+    def _do_get(self):
+        # QueuePool._do_get retries by calling self._do_get(); only the outermost call is measured.
+        if getattr(self._checkout, 'active', False):
+            return super()._do_get()
+        self._checkout.active = True
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            self._checkout.active = False
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_label).observe(time.perf_counter() - started)
+        DB_POOL_IN_USE.labels(self.metrics_label).inc()
+        return record
+
+    def _create_connection(self):
+        record = super()._create_connection()
+        # _do_get has already counted the new connection; above zero it is one past pool_size.
+        if self._overflow > 0:
+            DB_POOL_OVERFLOW_CHECKOUTS.labels(self.metrics_label).inc()
+        return record
+
+    def _do_return_conn(self, record):
+        DB_POOL_IN_USE.labels(self.metrics_label).dec()
+        super()._do_return_conn(record)
+
+# Pools log under their class's module; keep this one as quiet as SQLAlchemy's own pool loggers.
+logging.getLogger(f"{__name__}.{InstrumentedQueuePool.__name__}").setLevel(logging.WARNING)
+
+def _pool_options(config, name):
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_logging_name': name
+    }
+
+def _is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def configure_engine_options(app):
+    """Apply the DB_POOL_* settings to the default engine and every bind.
+
+    Must run before db.init_app. In-memory SQLite keeps Flask-SQLAlchemy's
+    single-connection pool.
+    """
+    config = app.config
+    if not _is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **_pool_options(config, 'default'),
+            **config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        }
+    binds = {}
+    for key, bind in config.get('SQLALCHEMY_BINDS', {}).items():
+        options = bind if isinstance(bind, dict) else {'url': bind}
+        if not _is_memory_sqlite(options['url']):
+            options = {**_pool_options(config, key), **options}
+        binds[key] = options
+    config['SQLALCHEMY_BINDS'] = binds
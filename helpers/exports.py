@@ -0,0 +1,135 @@
+import csv
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import StringIO
+from db import db
+from helpers.analytics_cube import REPORT_SPECS, report_query
+from models.export_job import ExportJob
+
+EXPORT_COLUMNS = {report_type: (spec[1], spec[2]) for report_type, spec in REPORT_SPECS.items()}
+
+_executor = None
+
+def export_header(report_type, by_day=False):
+    """Return the column names of a financial export."""
+    columns = EXPORT_COLUMNS[report_type]
+    return ('day',) + columns if by_day else columns
+
+def estimate_export_rows(report_type, date_from, date_to=None, by_day=False):
+    """Count the rows an export would produce without materializing them."""
+    return db.session.query(db.func.count()).select_from(
+        report_query(report_type, date_from, date_to, by_day).order_by(None).subquery()
+    ).scalar() or 0
+
+def iter_export_rows(report_type, date_from, date_to=None, by_day=False):
+    """Yield aggregated export rows straight from the database cursor."""
+    is_count = report_type == 'transactionVolume'
+    for row in report_query(report_type, date_from, date_to, by_day).yield_per(1000):
+        *keys, measure = row
+        if by_day:
+            keys[0] = keys[0].strftime('%Y-%m-%d') if hasattr(keys[0], 'strftime') else keys[0]
+        if EXPORT_COLUMNS[report_type][0] == 'profession':
+            keys[-1] = keys[-1] or "Unknown"
+        yield (*keys, int(measure) if is_count else float(measure))
+
+def stream_csv(header, rows, chunk_rows=500):
+    """Encode rows as CSV in chunks suitable for a streaming response."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def write_xlsx(header, rows, target, title):
+    """Write rows with openpyxl's write-only mode so rows are never held in memory."""
+    from openpyxl import Workbook  # Deferred: only xlsx exports pay for importing openpyxl
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31])
+    ws.append(list(header))
+    for row in rows:
+        ws.append(list(row))
+    wb.save(target)
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=app.config['EXPORT_WORKERS'], thread_name_prefix='export')
+    return _executor
+
+def fail_stale_export_jobs(timeout):
+    """Mark jobs still pending or running after timeout seconds as failed; returns how many."""
+    now = datetime.utcnow()
+    return ExportJob.query.filter(
+        ExportJob.status.in_(('pending', 'running')),
+        ExportJob.created_at < now - timedelta(seconds=timeout)
+    ).update({
+        "status": 'failed',
+        "error": 'Export did not finish; the worker running it was likely restarted',
+        "finished_at": now
+    }, synchronize_session=False)
+
+def export_file_path(app, job):
+    """Resolve a job's file against EXPORT_FOLDER, so instances mounting it elsewhere agree."""
+    return os.path.join(app.config['EXPORT_FOLDER'], job.file_path)
+
+def submit_export_job(app, created_by, report_type, export_format, date_from, date_to=None, by_day=False):
+    """Record an export job and run it on the background export pool.
+
+    The pool lives inside the worker process, so jobs only run on the
+    instance that accepted them and are lost if that worker restarts;
+    fail_stale_export_jobs marks those failed so clients can resubmit.
+    Finished files are read back from EXPORT_FOLDER, which must be shared
+    storage when more than one instance serves downloads.
+    """
+    fail_stale_export_jobs(app.config['EXPORT_JOB_TIMEOUT'])
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        created_by=created_by,
+        report_type=report_type,
+        format=export_format,
+        date_from=date_from,
+        date_to=date_to,
+        by_day=by_day,
+        status='pending'
+    )
+    db.session.add(job)
+    db.session.commit()
+    _get_executor(app).submit(_run_export_job, app, job.id)
+    return job
+
+def _run_export_job(app, job_id):
+    with app.app_context():
+        job = db.session.get(ExportJob, job_id)
+        try:
+            job.status = 'running'
+            db.session.commit()
+
+            os.makedirs(app.config['EXPORT_FOLDER'], exist_ok=True)
+            extension = 'csv' if job.format == 'csv' else 'xlsx'
+            job.file_path = f"{job.id}.{extension}"
+            path = export_file_path(app, job)
+            header = export_header(job.report_type, job.by_day)
+            rows = iter_export_rows(job.report_type, job.date_from, job.date_to, job.by_day)
+            if job.format == 'csv':
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    for chunk in stream_csv(header, rows):
+                        f.write(chunk)
+            else:
+                write_xlsx(header, rows, path, f"financial_{job.report_type}")
+
+            job.status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(ExportJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)[:500]
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        db.session.remove()
@@ -0,0 +1,104 @@
+import csv
+import math
+import threading
+import time
+from datetime import date
+from flask import current_app
+from db import db
+from models.fx_rate import FxRate
+from helpers.budgets import to_date
+
+MAX_CACHED_DAYS = 1024
+
+_rates_by_day = {}
+_rates_lock = threading.Lock()
+
+def load_rates_file(path):
+    """Upsert rates from a CSV with date, currency and rate columns; returns the rows written.
+
+    rate is the number of units of currency per one unit of FX_BASE_CURRENCY.
+    """
+    rates = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for record in csv.DictReader(f):
+            rate = float(record['rate'])
+            if rate <= 0:
+                raise ValueError(f"Rate for {record['currency']} on {record['date']} must be positive")
+            rates[(to_date(record['date']), record['currency'].strip().upper())] = rate
+    if not rates:
+        return 0
+
+    days = [day for day, _ in rates]
+    existing = {
+        (row.day, row.currency): row
+        for row in FxRate.query.filter(FxRate.day.between(min(days), max(days))).all()
+    }
+    for (day, currency), rate in rates.items():
+        row = existing.get((day, currency))
+        if row:
+            row.rate = rate
+        else:
+            db.session.add(FxRate(day=day, currency=currency, rate=rate))
+    db.session.commit()
+    clear_rate_cache()
+    return len(rates)
+
+def clear_rate_cache():
+    with _rates_lock:
+        _rates_by_day.clear()
+
+def rates_on(day):
+    """Return {currency: rate} using each currency's latest rate on or before day."""
+    now = time.monotonic()
+    with _rates_lock:
+        cached = _rates_by_day.get(day)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    latest = db.session.query(
+        FxRate.currency,
+        db.func.max(FxRate.day).label('day')
+    ).filter(FxRate.day <= day).group_by(FxRate.currency).subquery()
+    rows = db.session.query(FxRate.currency, FxRate.rate).join(
+        latest, (FxRate.currency == latest.c.currency) & (FxRate.day == latest.c.day)
+    ).all()
+    rates = {currency: rate for currency, rate in rows}
+    rates[current_app.config['FX_BASE_CURRENCY'].strip().upper()] = 1.0
+
+    # Rates loaded by another process only show up once the entry expires.
+    with _rates_lock:
+        if len(_rates_by_day) >= MAX_CACHED_DAYS:
+            _rates_by_day.clear()
+        _rates_by_day[day] = (rates, now + current_app.config['FX_RATE_CACHE_TTL'])
+    return rates
+
+def convert_amounts(amounts, currencies, days=None, to_currency=None):
+    """Convert amounts to one currency at each row's date, vectorized over the result set.
+
+    Rates are looked up once per distinct (day, currency); rows with no rate come back as NaN.
+    """
+    import numpy as np
+    to_currency = (to_currency or current_app.config['FX_REPORTING_CURRENCY']).strip().upper()
+    amounts = np.asarray(amounts, dtype=float)
+    if not len(amounts):
+        return amounts
+    # Rates are stored uppercased, so ' usd' and 'USD' must share a column.
+    currencies = np.asarray([(currency or '').strip().upper() for currency in currencies])
+    days = np.asarray(days if days is not None else [date.today()] * len(amounts), dtype='datetime64[D]')
+
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    unique_currencies, currency_index = np.unique(currencies, return_inverse=True)
+    factors = np.full((len(unique_days), len(unique_currencies)), np.nan)
+    for i, day in enumerate(unique_days.astype(date)):
+        rates = rates_on(day)
+        target = rates.get(to_currency)
+        for j, currency in enumerate(unique_currencies):
+            if currency == to_currency:
+                factors[i, j] = 1.0
+            elif target and rates.get(currency):
+                factors[i, j] = target / rates[currency]
+    return amounts * factors[day_index, currency_index]
+
+def money(value):
+    """Round a converted amount for JSON, mapping a missing rate (NaN) to None."""
+    return None if math.isnan(value) else round(float(value), 2)
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 64 * 1024
+FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+THUMBNAIL_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+)
+CONTENT_NAME = re.compile(r'^(?P<digest>[0-9a-f]{64})(?:_(?P<size>\d+))?\.(?P<ext>[a-z]+)$')
+
+_executor = None
+
+def save_upload(file, folder, max_bytes):
+    """Stream an uploaded image to disk under its SHA-256 name; returns (digest, filename).
+
+    The upload is copied in chunks and rejected past max_bytes or if Pillow
+    can't identify it. Identical uploads resolve to the same stored file.
+    """
+    from PIL import Image, UnidentifiedImageError  # Deferred: most workers only build thumbnail URLs
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"File exceeds the {max_bytes // (1024 * 1024)} MB limit.")
+                digest.update(chunk)
+                out.write(chunk)
+
+        try:
+            with Image.open(temp_path) as image:
+                image_format = image.format
+                image.verify()
+        except Image.DecompressionBombError:
+            raise ValueError("Image dimensions are too large.")
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            raise ValueError("Uploaded file is not a valid image.")
+        if image_format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+
+        digest = digest.hexdigest()
+        filename = f"{digest}.{FORMAT_EXTENSIONS[image_format]}"
+        target = os.path.join(folder, filename)
+        if os.path.exists(target):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, target)
+        return digest, filename
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def thumbnail_name(digest, size, ext='webp'):
+    return f"{digest}_{size}.{ext}"
+
+def generate_thumbnails(folder, filename, sizes):
+    """Write square WebP and JPEG thumbnails of a stored image; existing ones are kept."""
+    from PIL import Image, ImageOps
+    digest = CONTENT_NAME.match(filename).group('digest')
+    with Image.open(os.path.join(folder, filename)) as source:
+        image = ImageOps.exif_transpose(source).convert('RGB')
+    written = []
+    for size in sizes:
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for ext, image_format, options in THUMBNAIL_FORMATS:
+            name = thumbnail_name(digest, size, ext)
+            target = os.path.join(folder, name)
+            if os.path.exists(target):
+                continue
+            temp_path = f"{target}.tmp"
+            thumbnail.save(temp_path, image_format, **options)
+            os.replace(temp_path, target)
+            written.append(name)
+    return written
+
+def resolve_upload(folder, filename):
+    """Return the stored file to serve for filename, falling back to the original while its thumbnail is pending."""
+    if os.path.exists(os.path.join(folder, filename)):
+        return filename
+    match = CONTENT_NAME.match(filename)
+    if match and match.group('size'):
+        for ext in FORMAT_EXTENSIONS.values():
+            original = f"{match.group('digest')}.{ext}"
+            if os.path.exists(os.path.join(folder, original)):
+                return original
+    return None
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'], thread_name_prefix='thumbnails')
+    return _executor
+
+def submit_thumbnails(app, filename):
+    """Generate an upload's thumbnails on the background image pool."""
+    def run():
+        try:
+            generate_thumbnails(app.config['UPLOAD_FOLDER'], filename, app.config['THUMBNAIL_SIZES'])
+        except Exception as e:
+            app.logger.warning(f"Thumbnail generation failed for {filename}: {e}")
+    return _get_executor(app).submit(run)
+
+def thumbnail_url(picture_url, size, ext='webp'):
+    """Map a content-addressed upload URL to its thumbnail URL; other URLs are returned unchanged."""
+    if not picture_url:
+        return picture_url
+    base, _, filename = picture_url.rpartition('/')
+    match = CONTENT_NAME.match(filename)
+    if not match or match.group('size'):
+        return picture_url
+    return f"{base}/{thumbnail_name(match.group('digest'), size, ext)}"
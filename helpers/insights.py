@@ -0,0 +1,144 @@
+from datetime import date, timedelta
+from db import db
+from models.transaction import Transaction
+from helpers.savings import previous_month_start
+
+INSIGHT_PERIODS = {'month': 1, 'quarter': 3, 'year': 12}
+TOP_NOTES = 5
+
+def _month_key(day):
+    return day.strftime('%Y-%m')
+
+def _next_month_start(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _change(current, previous):
+    change = current - previous
+    return {
+        "current": round(current, 2),
+        "previous": round(previous, 2),
+        "change": round(change, 2),
+        "change_pct": round(change / previous * 100, 1) if previous else None
+    }
+
+def spending_insights(user_id, period='month', today=None):
+    """Summarize a user's income and spending over the last 1, 3 or 12 calendar months.
+
+    One grouped query over (type, category, month) feeds the totals, category
+    breakdown and monthly series; a second one ranks the most expensive notes.
+    """
+    months = INSIGHT_PERIODS[period]
+    today = today or date.today()
+    period_from = today.replace(day=1)
+    for _ in range(months - 1):
+        period_from = previous_month_start(period_from)
+    # One extra month so the first month in the window has something to compare against.
+    query_from = previous_month_start(period_from)
+
+    year = db.func.extract('year', Transaction.date)
+    month = db.func.extract('month', Transaction.date)
+    rows = db.session.query(
+        Transaction.type,
+        Transaction.category,
+        year,
+        month,
+        db.func.sum(Transaction.amount),
+        db.func.count(Transaction.my_row_id)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= query_from,
+        Transaction.date <= today
+    ).group_by(Transaction.type, Transaction.category, year, month).all()
+
+    monthly = {}
+    categories = {}
+    for type_, category, y, m, amount, count in rows:
+        if type_ not in ('income', 'expense'):
+            continue
+        key = f"{int(y):04d}-{int(m):02d}"
+        bucket = monthly.setdefault(key, {"income": 0.0, "expense": 0.0, "categories": {}})
+        amount = float(amount or 0)
+        bucket[type_] += amount
+        if type_ == 'expense':
+            bucket["categories"][category] = bucket["categories"].get(category, 0.0) + amount
+            if key >= _month_key(period_from):
+                total, txn_count = categories.get(category, (0.0, 0))
+                categories[category] = (total + amount, txn_count + int(count))
+
+    month_keys = []
+    cursor = period_from
+    while cursor <= today:
+        month_keys.append(_month_key(cursor))
+        cursor = _next_month_start(cursor)
+    empty = {"income": 0.0, "expense": 0.0, "categories": {}}
+
+    series = []
+    previous = monthly.get(_month_key(query_from), empty)
+    for key in month_keys:
+        current = monthly.get(key, empty)
+        series.append({
+            "month": key,
+            "income": round(current["income"], 2),
+            "expense": round(current["expense"], 2),
+            "net": round(current["income"] - current["expense"], 2),
+            "expense_change_pct": _change(current["expense"], previous["expense"])["change_pct"]
+        })
+        previous = current
+
+    latest_key = month_keys[-1]
+    prior_key = month_keys[-2] if len(month_keys) > 1 else _month_key(query_from)
+    latest, prior = monthly.get(latest_key, empty), monthly.get(prior_key, empty)
+    category_changes = [
+        {"category": category, **_change(latest["categories"].get(category, 0.0), prior["categories"].get(category, 0.0))}
+        for category in set(latest["categories"]) | set(prior["categories"])
+    ]
+    category_changes.sort(key=lambda item: abs(item["change"]), reverse=True)
+
+    income = sum(item["income"] for item in series)
+    expense = sum(item["expense"] for item in series)
+    breakdown = [
+        {
+            "category": category,
+            "amount": round(total, 2),
+            "count": txn_count,
+            "share": round(total / expense * 100, 1) if expense else 0.0
+        }
+        for category, (total, txn_count) in sorted(categories.items(), key=lambda item: item[1][0], reverse=True)
+    ]
+
+    top_notes = db.session.query(
+        Transaction.note,
+        db.func.sum(Transaction.amount).label('total'),
+        db.func.count(Transaction.my_row_id)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == 'expense',
+        Transaction.date >= period_from,
+        Transaction.date <= today,
+        Transaction.note.isnot(None),
+        Transaction.note != ''
+    ).group_by(Transaction.note).order_by(db.desc('total')).limit(TOP_NOTES).all()
+
+    return {
+        "period": period,
+        "from": period_from.strftime('%Y-%m-%d'),
+        "to": today.strftime('%Y-%m-%d'),
+        "totals": {
+            "income": round(income, 2),
+            "expense": round(expense, 2),
+            "net": round(income - expense, 2)
+        },
+        "categories": breakdown,
+        "monthly": series,
+        "month_over_month": {
+            "month": latest_key,
+            "previous_month": prior_key,
+            "income": _change(latest["income"], prior["income"]),
+            "expense": _change(latest["expense"], prior["expense"]),
+            "categories": category_changes
+        },
+        "top_notes": [
+            {"note": note, "amount": round(float(total), 2), "count": int(count)}
+            for note, total, count in top_notes
+        ]
+    }
@@ -0,0 +1,38 @@
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'smartsave_db_pool_checkout_seconds',
+    'Time spent waiting for a pooled database connection',
+    ['pool'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+DB_POOL_IN_USE = Gauge(
+    'smartsave_db_pool_connections_in_use',
+    'Database connections currently checked out',
+    ['pool'],
+    multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW_CHECKOUTS = Counter(
+    'smartsave_db_pool_overflow_checkouts',
+    'Checkouts served by a connection opened beyond pool_size',
+    ['pool']
+)
+DB_POOL_TIMEOUTS = Counter(
+    'smartsave_db_pool_timeouts',
+    'Checkouts that gave up after pool_timeout',
+    ['pool']
+)
+
+def render_metrics():
+    """Return (body, content type) for a Prometheus scrape.
+
+    Under gunicorn with PROMETHEUS_MULTIPROC_DIR set, samples from every
+    worker are merged; otherwise only this process is reported.
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,126 @@
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+def _gevent_patched():
+    if 'gevent' not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched('threading')
+
+class PasswordService:
+    """Hash and verify passwords on a bounded worker pool.
+
+    The calling request still waits for its hash; the pool caps how many
+    hashes run at once so a login burst can't take every core. argon2,
+    bcrypt and hashlib's pbkdf2 release the GIL, so under gthread other
+    request threads keep running meanwhile. Under gevent, monkey.patch_all()
+    turns ordinary pool threads into greenlets that would hash on the hub,
+    so gevent's native-thread executor is used instead and only the waiting
+    greenlet blocks. Hashes in any supported scheme verify; only the
+    configured one is produced.
+    """
+
+    def __init__(self, algorithm='argon2', workers=2, argon2_time_cost=2, argon2_memory_cost=19456,
+                 argon2_parallelism=1, bcrypt_rounds=12, pbkdf2_iterations=600000, timeout=30):
+        if algorithm not in ('argon2', 'bcrypt', 'pbkdf2'):
+            raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.bcrypt_rounds = bcrypt_rounds
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.timeout = timeout
+        self._argon2 = None
+        if algorithm == 'argon2':
+            from argon2 import PasswordHasher
+            self._argon2 = PasswordHasher(
+                time_cost=argon2_time_cost,
+                memory_cost=argon2_memory_cost,
+                parallelism=argon2_parallelism
+            )
+        self.workers = workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created on first use so a preloading gunicorn master never starts pool threads before forking.
+        with self._executor_lock:
+            if self._executor is None:
+                if _gevent_patched():
+                    from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+                    self._executor = NativeThreadPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    def _hash(self, password):
+        if self.algorithm == 'argon2':
+            return self._argon2.hash(password)
+        if self.algorithm == 'bcrypt':
+            import bcrypt
+            return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.bcrypt_rounds)).decode('utf-8')
+        return generate_password_hash(password, method=f'pbkdf2:sha256:{self.pbkdf2_iterations}')
+
+    def _verify(self, stored, password):
+        if stored.startswith('$argon2'):
+            from argon2 import PasswordHasher
+            from argon2.exceptions import VerificationError, InvalidHashError
+            try:
+                return (self._argon2 or PasswordHasher()).verify(stored, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        if stored.startswith(BCRYPT_PREFIXES):
+            import bcrypt
+            return bcrypt.checkpw(password.encode('utf-8'), stored.encode('utf-8'))
+        return check_password_hash(stored, password)
+
+    def needs_rehash(self, stored):
+        """Whether a stored hash uses another scheme or weaker parameters than configured."""
+        if self.algorithm == 'argon2':
+            return not stored.startswith('$argon2') or self._argon2.check_needs_rehash(stored)
+        if self.algorithm == 'bcrypt':
+            match = re.match(r'^\$2[aby]\$(\d+)\$', stored)
+            return not match or int(match.group(1)) < self.bcrypt_rounds
+        match = re.match(r'^pbkdf2:sha256:(\d+)\$', stored)
+        return not match or int(match.group(1)) < self.pbkdf2_iterations
+
+    def hash(self, password):
+        return self._get_executor().submit(self._hash, password).result(self.timeout)
+
+    def verify(self, stored, password):
+        if not stored or not password:
+            return False
+        return self._get_executor().submit(self._verify, stored, password).result(self.timeout)
+
+    def verify_and_update(self, stored, password):
+        """Verify a password; on success also return a fresh hash if the stored one is outdated."""
+        if not self.verify(stored, password):
+            return False, None
+        return True, self.hash(password) if self.needs_rehash(stored) else None
+
+def init_passwords(app):
+    """Attach the password service configured by PASSWORD_HASH_* settings to the app."""
+    service = PasswordService(
+        algorithm=app.config['PASSWORD_HASH_ALGORITHM'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        argon2_time_cost=app.config['ARGON2_TIME_COST'],
+        argon2_memory_cost=app.config['ARGON2_MEMORY_COST'],
+        argon2_parallelism=app.config['ARGON2_PARALLELISM'],
+        bcrypt_rounds=app.config['BCRYPT_ROUNDS'],
+        pbkdf2_iterations=app.config['PBKDF2_ITERATIONS']
+    )
+    app.extensions['password_service'] = service
+    return service
+
+def get_password_service():
+    return current_app.extensions['password_service']
+
+def hash_password(password):
+    return get_password_service().hash(password)
+
+def verify_password(stored, password):
+    return get_password_service().verify(stored, password)
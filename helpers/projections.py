@@ -0,0 +1,105 @@
+from datetime import date, datetime, timedelta
+from db import db
+from models.goal_contribution import GoalContribution
+from models.goal_projection import GoalProjection
+from models.savings_goal import SavingsGoal
+from helpers.utils import insert_ignore
+
+DAYS_PER_MONTH = 30.4375
+PACE_WINDOW_DAYS = 90
+MAX_PROJECTION_DAYS = 365 * 50
+
+def monthly_pace(goal_ids, today=None):
+    """Return {goal_id: average monthly contribution over the pace window}."""
+    if not goal_ids:
+        return {}
+    today = today or date.today()
+    since = datetime.combine(today - timedelta(days=PACE_WINDOW_DAYS), datetime.min.time())
+    rows = db.session.query(
+        GoalContribution.goal_id,
+        db.func.sum(GoalContribution.amount)
+    ).filter(
+        GoalContribution.goal_id.in_(goal_ids),
+        GoalContribution.created_at >= since,
+        GoalContribution.backfilled.is_(False)
+    ).group_by(
+        GoalContribution.goal_id
+    ).all()
+    months = PACE_WINDOW_DAYS / DAYS_PER_MONTH
+    return {goal_id: float(total) / months for goal_id, total in rows}
+
+def compute_projections(goals, pace_by_goal, today=None):
+    """Project every goal at once with array math; returns unsaved GoalProjection rows."""
+    import numpy as np
+    if not goals:
+        return []
+    today = today or date.today()
+    count = len(goals)
+
+    target = np.fromiter((g.target for g in goals), dtype=np.float64, count=count)
+    progress = np.fromiter((g.progress for g in goals), dtype=np.float64, count=count)
+    days_left = np.fromiter(((g.deadline - today).days for g in goals), dtype=np.float64, count=count)
+    pace = np.fromiter((pace_by_goal.get(g.id, 0.0) for g in goals), dtype=np.float64, count=count)
+
+    remaining = np.maximum(target - progress, 0.0)
+    months_left = np.maximum(days_left, 0.0) / DAYS_PER_MONTH
+    # With less than a month left the whole remainder is due now.
+    required = remaining / np.maximum(months_left, 1.0)
+
+    positive_pace = pace > 0
+    days_to_complete = np.full(count, np.inf)
+    np.divide(remaining * DAYS_PER_MONTH, pace, out=days_to_complete, where=positive_pace)
+    days_to_complete[remaining <= 0] = 0.0
+
+    completed = remaining <= 0
+    on_track = completed | (days_to_complete <= np.maximum(days_left, 0.0))
+    status = np.where(completed, 'completed', np.where(on_track, 'on_track', 'at_risk'))
+
+    projections = []
+    for i, goal in enumerate(goals):
+        days = days_to_complete[i]
+        projected = today + timedelta(days=int(np.ceil(days))) if days <= MAX_PROJECTION_DAYS else None
+        projections.append(GoalProjection(
+            goal_id=goal.id,
+            user_id=goal.user_id,
+            required_monthly=round(float(required[i]), 2),
+            monthly_pace=round(float(pace[i]), 2),
+            projected_completion=projected,
+            status=str(status[i]),
+            computed_on=today
+        ))
+    return projections
+
+def invalidate_projections(goal_ids):
+    """Drop cached projections for goals whose inputs changed."""
+    goal_ids = [goal_id for goal_id in goal_ids if goal_id is not None]
+    if goal_ids:
+        GoalProjection.query.filter(GoalProjection.goal_id.in_(goal_ids)).delete(synchronize_session=False)
+
+def store_projections(projections):
+    """Insert computed projections, skipping goals a concurrent writer already stored."""
+    if projections:
+        db.session.execute(insert_ignore(GoalProjection.__table__), [
+            {column.name: getattr(projection, column.name) for column in GoalProjection.__table__.columns}
+            for projection in projections
+        ])
+
+def precompute_projections(batch_size=5000, today=None):
+    """Recompute projections for every goal in batches (nightly job)."""
+    today = today or date.today()
+    computed = 0
+    last_row_id = 0
+    while True:
+        goals = SavingsGoal.query.filter(
+            SavingsGoal.my_row_id > last_row_id
+        ).order_by(SavingsGoal.my_row_id).limit(batch_size).all()
+        if not goals:
+            break
+        goal_ids = [goal.id for goal in goals]
+        projections = compute_projections(goals, monthly_pace(goal_ids, today), today)
+        invalidate_projections(goal_ids)
+        store_projections(projections)
+        last_row_id = goals[-1].my_row_id
+        db.session.commit()
+        computed += len(projections)
+    return computed
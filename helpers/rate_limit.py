@@ -0,0 +1,173 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+_REDIS_TAKE = """
+local cost = tonumber(ARGV[1])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local tokens = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens[i] = math.min(capacity, available + math.max(0, now - ts) * rate)
+    if tokens[i] < cost then
+        retry_after = math.max(retry_after, (cost - tokens[i]) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    if retry_after == 0 then
+        tokens[i] = tokens[i] - cost
+    end
+    redis.call('HSET', key, 'tokens', tokens[i], 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return tostring(retry_after)
+"""
+
+def parse_limit(limit):
+    """Parse '5/minute' or '10/15 minutes' into (capacity, refill tokens per second)."""
+    count, period = limit.split('/')
+    parts = period.split()
+    multiplier = int(parts[0]) if len(parts) == 2 else 1
+    seconds = PERIODS[parts[-1].rstrip('s')] * multiplier
+    return int(count), int(count) / seconds
+
+class MemoryBucketStore:
+    """In-process token buckets keyed by string, evicting least recently used keys.
+
+    Every worker process keeps its own buckets, so under gunicorn with N
+    workers a client can get up to N times each limit. Use the Redis store
+    where the limit itself matters.
+    """
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, cost=1):
+        """Spend cost tokens; returns 0 if allowed, else seconds until enough have refilled."""
+        return self.take_many([(key, capacity, rate)], cost)
+
+    def take_many(self, buckets, cost=1):
+        """Spend cost tokens from every (key, capacity, rate) bucket, or from none.
+
+        Returns 0 if all buckets allowed it, else the longest wait until they would.
+        """
+        now = self.clock()
+        with self._lock:
+            tokens = []
+            for key, capacity, rate in buckets:
+                available, updated_at = self._buckets.get(key, (capacity, now))
+                tokens.append(min(capacity, available + (now - updated_at) * rate))
+            retry_after = max(
+                [(cost - available) / rate for available, (_, _, rate) in zip(tokens, buckets) if available < cost],
+                default=0
+            )
+            for available, (key, _, _) in zip(tokens, buckets):
+                self._buckets[key] = (available if retry_after else available - cost, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+class RedisBucketStore:
+    """Token buckets kept in Redis so every worker shares the same limits."""
+
+    def __init__(self, url, prefix='smartsave:ratelimit:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(_REDIS_TAKE)
+
+    def take(self, key, capacity, rate, cost=1):
+        return self.take_many([(key, capacity, rate)], cost)
+
+    def take_many(self, buckets, cost=1):
+        args = [cost]
+        for _, capacity, rate in buckets:
+            args += [capacity, rate]
+        return float(self._take(keys=[self.prefix + key for key, _, _ in buckets], args=args))
+
+    def reset(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+def init_rate_limiting(app):
+    """Attach the configured token-bucket store to the app."""
+    if app.config['RATE_LIMIT_BACKEND'] == 'redis' and app.config['RATE_LIMIT_REDIS_URL']:
+        store = RedisBucketStore(app.config['RATE_LIMIT_REDIS_URL'])
+    else:
+        store = MemoryBucketStore(app.config['RATE_LIMIT_MAX_KEYS'])
+    app.extensions['rate_limiter'] = store
+    return store
+
+def client_ip():
+    """Return the caller's address, trusting RATE_LIMIT_PROXY_HOPS proxies in front of the app."""
+    hops = current_app.config['RATE_LIMIT_PROXY_HOPS']
+    route = request.access_route
+    if hops and len(route) >= hops:
+        return route[-hops]
+    return request.remote_addr or 'unknown'
+
+def _request_email():
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+_KEY_FUNCS = {
+    'ip': client_ip,
+    'email': _request_email,
+    'user': lambda: get_jwt_identity()
+}
+
+def rate_limit(scope, **limits):
+    """Throttle a view with one token bucket per keyed limit, e.g. ip='10/hour', email='3/15 minutes'.
+
+    Endpoints sharing a scope share buckets. A request is charged against all
+    of its buckets or, if any one rejects it, none of them. 'user' limits need
+    the JWT to be verified first, so apply this below jwt_required. With the
+    memory backend limits are per worker process (see MemoryBucketStore).
+    """
+    parsed = {key_type: parse_limit(limit) for key_type, limit in limits.items()}
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if current_app.config['RATE_LIMIT_ENABLED']:
+                buckets = []
+                for key_type, (capacity, rate) in parsed.items():
+                    identity = _KEY_FUNCS[key_type]()
+                    if identity is not None:
+                        buckets.append((f"{scope}:{key_type}:{identity}", capacity, rate))
+                retry_after = current_app.extensions['rate_limiter'].take_many(buckets) if buckets else 0
+                if retry_after:
+                    seconds = math.ceil(retry_after)
+                    response = jsonify({
+                        "success": False,
+                        "message": f"Too many requests. Try again in {seconds} seconds.",
+                        "retry_after": seconds
+                    })
+                    response.headers['Retry-After'] = str(seconds)
+                    return response, 429
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
@@ -0,0 +1,181 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from db import db
+from models.revoked_token import RevokedToken
+from helpers.utils import insert_ignore
+
+SYNC_OVERLAP = timedelta(seconds=60)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing of one blake2b digest."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class RevocationList:
+    """Answer "is this jti revoked?" without a query for the common, unrevoked case.
+
+    A Bloom filter of revoked jtis is synced from revoked_tokens every
+    sync_interval seconds (incrementally, with a periodic full rebuild that
+    drops expired tokens). Only filter hits reach the database, and their
+    answers are kept in a small LRU until the next sync.
+    """
+
+    def __init__(self, sync_interval=30, full_sync_interval=3600, capacity=10000, lru_size=10000, clock=time.monotonic):
+        self.sync_interval = sync_interval
+        self.full_sync_interval = full_sync_interval
+        self.capacity = capacity
+        self.lru_size = lru_size
+        self.clock = clock
+        self._bloom = None
+        self._confirmed = OrderedDict()
+        self._high_water = None
+        self._synced_at = None
+        self._full_synced_at = None
+        self._syncing = False
+        self._added_during_sync = []
+        self._lock = threading.Lock()
+
+    def _begin_sync(self):
+        """Claim the sync if one is due; returns (full, high_water) or None. Call with the lock held."""
+        now = self.clock()
+        if self._syncing or (self._synced_at is not None and now - self._synced_at < self.sync_interval):
+            return None
+        self._syncing = True
+        self._added_during_sync = []
+        full = self._bloom is None or now - self._full_synced_at >= self.full_sync_interval
+        return full, self._high_water
+
+    def _fetch(self, full, high_water):
+        query = db.session.query(RevokedToken.jti, RevokedToken.revoked_at).filter(
+            RevokedToken.expires_at > datetime.utcnow()
+        )
+        if not full:
+            query = query.filter(RevokedToken.revoked_at >= high_water - SYNC_OVERLAP)
+        return query.all()
+
+    def _finish_sync(self, full, rows):
+        """Fold fetched rows into the filter. Call with the lock held."""
+        now = self.clock()
+        if full:
+            bloom = BloomFilter(max(self.capacity, len(rows) * 2))
+            # Revocations added while the query ran may be missing from its rows.
+            for jti in self._added_during_sync:
+                bloom.add(jti)
+            self._full_synced_at = now
+        else:
+            bloom = self._bloom
+        high_water = self._high_water
+        for jti, revoked_at in rows:
+            bloom.add(jti)
+            high_water = max(high_water, revoked_at) if high_water else revoked_at
+        self._bloom = bloom
+        self._high_water = high_water or datetime.utcnow()
+        self._synced_at = now
+        self._syncing = False
+        self._added_during_sync = []
+        self._confirmed.clear()
+        # Past capacity the false-positive rate climbs; rebuild bigger on the next sync.
+        if bloom.count > bloom.capacity:
+            self._full_synced_at = now - self.full_sync_interval
+
+    def is_revoked(self, jti):
+        # The sync query runs outside the lock so other threads keep answering from the current filter.
+        with self._lock:
+            sync = self._begin_sync()
+        if sync:
+            full, high_water = sync
+            try:
+                rows = self._fetch(full, high_water)
+            except Exception:
+                with self._lock:
+                    self._syncing = False
+                raise
+            with self._lock:
+                self._finish_sync(full, rows)
+
+        with self._lock:
+            # Before the first sync completes every check falls through to the database.
+            if self._bloom is not None:
+                if jti not in self._bloom:
+                    return False
+                if jti in self._confirmed:
+                    self._confirmed.move_to_end(jti)
+                    return self._confirmed[jti]
+
+        revoked = db.session.query(RevokedToken.jti).filter_by(jti=jti).first() is not None
+        with self._lock:
+            self._confirmed[jti] = revoked
+            while len(self._confirmed) > self.lru_size:
+                self._confirmed.popitem(last=False)
+        return revoked
+
+    def add(self, jti):
+        """Make a revocation visible in this process immediately."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            if self._syncing:
+                self._added_during_sync.append(jti)
+            self._confirmed[jti] = True
+
+def init_revocation(app, jwt):
+    """Check every JWT against the revocation list through Flask-JWT-Extended's blocklist hook."""
+    revocations = RevocationList(
+        sync_interval=app.config['REVOCATION_SYNC_SECONDS'],
+        capacity=app.config['REVOCATION_BLOOM_CAPACITY']
+    )
+    app.extensions['revocation_list'] = revocations
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return revocations.is_revoked(jwt_payload['jti'])
+
+    return revocations
+
+def revoke_token(jwt_payload):
+    """Record a decoded token as revoked until it would have expired anyway.
+
+    Returns False if it was already revoked.
+    """
+    jti = jwt_payload['jti']
+    identity = jwt_payload.get('sub')
+    with db.engine.begin() as conn:
+        result = conn.execute(insert_ignore(RevokedToken.__table__), {
+            "jti": jti,
+            "user_id": int(identity) if str(identity).isdigit() else None,
+            "token_type": jwt_payload.get('type', 'access'),
+            "revoked_at": datetime.utcnow(),
+            "expires_at": datetime.utcfromtimestamp(jwt_payload['exp'])
+        })
+    current_app.extensions['revocation_list'].add(jti)
+    return result.rowcount == 1
+
+def purge_expired_revocations():
+    """Delete revocations for tokens that have expired on their own."""
+    deleted = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,158 @@
+from datetime import date, datetime, timedelta
+from db import db
+from models.goal_contribution import GoalContribution
+from models.savings_rollup import SavingsRollup
+from models.user_streak import UserStreak
+from helpers.projections import invalidate_projections
+from helpers.analytics_cube import record_savings_fact
+from helpers.cache import invalidate_on_commit
+from helpers.utils import insert_increment
+
+ROLLUP_PERIODS = ('weekly', 'monthly', 'yearly')
+
+def rollup_period_start(period, day):
+    """Return the first day of the weekly, monthly or yearly bucket containing day."""
+    if period == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if period == 'yearly':
+        return date(day.year, 1, 1)
+    return day.replace(day=1)
+
+def previous_month_start(month_start):
+    """Return the first day of the month before month_start."""
+    return (month_start - timedelta(days=1)).replace(day=1)
+
+def effective_current_streak(streak, today=None):
+    """Return the stored current streak, or 0 if the user missed last month."""
+    if not streak.last_active_period:
+        return 0
+    this_month = (today or date.today()).replace(day=1)
+    if streak.last_active_period < previous_month_start(this_month):
+        return 0
+    return streak.current_streak
+
+def active_months(*filters):
+    """Return (user_id, month_start) for every month with positive net contributions, oldest first.
+
+    Backfilled contributions never count toward a month.
+    """
+    month_key = db.func.extract('year', GoalContribution.created_at) * 100 + db.func.extract('month', GoalContribution.created_at)
+    rows = db.session.query(
+        GoalContribution.user_id,
+        month_key.label('month_key')
+    ).filter(
+        GoalContribution.backfilled.is_(False),
+        *filters
+    ).group_by(
+        GoalContribution.user_id, 'month_key'
+    ).having(
+        db.func.sum(GoalContribution.amount) > 0
+    ).order_by(
+        GoalContribution.user_id, 'month_key'
+    ).all()
+    return [(user_id, date(int(key) // 100, int(key) % 100, 1)) for user_id, key in rows]
+
+def fold_month(streak, month):
+    """Extend the streak with an active month later than its last one."""
+    if streak.last_active_period == previous_month_start(month):
+        streak.current_streak += 1
+    else:
+        streak.current_streak = 1
+    streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+    streak.last_active_period = month
+
+def advance_streak(user_id, day):
+    """Re-evaluate the month containing day for the user's streak.
+
+    A month counts when its net contributions are positive, the same rule
+    rebuild_streaks applies. A positive month after the last active one just
+    extends the streak; a change to a month that was already counted (a
+    withdrawal, or a backdated contribution) refolds the user's history.
+    """
+    month = day.replace(day=1)
+    month_start = datetime.combine(month, datetime.min.time())
+    month_end = datetime.combine((month + timedelta(days=32)).replace(day=1), datetime.min.time())
+    net = db.session.query(db.func.sum(GoalContribution.amount)).filter(
+        GoalContribution.user_id == user_id,
+        GoalContribution.backfilled.is_(False),
+        GoalContribution.created_at >= month_start,
+        GoalContribution.created_at < month_end
+    ).scalar() or 0
+
+    streak = db.session.get(UserStreak, user_id)
+    if not streak:
+        streak = UserStreak(user_id=user_id, current_streak=0, longest_streak=0)
+        db.session.add(streak)
+
+    last = streak.last_active_period
+    if not last or month > last:
+        if net > 0:
+            fold_month(streak, month)
+        return streak
+    if month == last and net > 0:
+        return streak
+
+    streak.current_streak = 0
+    streak.longest_streak = 0
+    streak.last_active_period = None
+    for _, active in active_months(GoalContribution.user_id == user_id):
+        fold_month(streak, active)
+    return streak
+
+def record_contributions(user_id, changes, when=None, backfilled=False):
+    """Append goal contributions and fold them into the user's period rollups.
+
+    changes is an iterable of (goal_id, amount) pairs; zero amounts are skipped.
+    Backfilled contributions only seed goal history: they stay out of the
+    rollups, the analytics cube and streaks, so they don't show up as a spike
+    in period trends. Everything runs in the current session so it commits
+    with the caller.
+    """
+    when = when or datetime.utcnow()
+    changes = [(goal_id, float(amount)) for goal_id, amount in changes if amount]
+    if not changes:
+        return []
+
+    contributions = [
+        GoalContribution(goal_id=goal_id, user_id=user_id, amount=amount, created_at=when, backfilled=backfilled)
+        for goal_id, amount in changes
+    ]
+    db.session.add_all(contributions)
+    invalidate_on_commit(f"goals:{user_id}")
+    invalidate_projections([goal_id for goal_id, _ in changes])
+    if backfilled:
+        return contributions
+
+    total = sum(amount for _, amount in changes)
+    day = when.date()
+    db.session.execute(
+        insert_increment(SavingsRollup.__table__, ('user_id', 'period', 'period_start'), ('total', 'contribution_count')),
+        [
+            {
+                "user_id": user_id,
+                "period": period,
+                "period_start": rollup_period_start(period, day),
+                "total": total,
+                "contribution_count": len(changes)
+            }
+            for period in ROLLUP_PERIODS
+        ]
+    )
+
+    record_savings_fact(user_id, day, total, len(changes))
+    advance_streak(user_id, day)
+    return contributions
+
+def rebuild_streaks():
+    """Recompute every user's streak state from contribution history."""
+    UserStreak.query.delete()
+    streaks = {}
+    for user_id, month in active_months():
+        streak = streaks.get(user_id)
+        if not streak:
+            streak = streaks[user_id] = UserStreak(user_id=user_id, current_streak=0, longest_streak=0)
+        fold_month(streak, month)
+
+    db.session.add_all(streaks.values())
+    db.session.commit()
+    return len(streaks)
@@ -0,0 +1,244 @@
+from datetime import date, timedelta
+from db import db
+from models.bill_split import BillSplit
+from models.split_participant import SplitParticipant
+from models.user import User
+from helpers.budgets import to_date
+from helpers.cache import invalidate_on_commit
+from helpers.fx import convert_amounts, money
+
+MODERATION_PAGE_SIZE = 50
+
+def invalidate_split_analytics(*group_ids):
+    """Retire cached admin split stats and the analytics of the groups a split change touched."""
+    invalidate_on_commit('splits:admin', *(f"splits:group:{group_id}" for group_id in group_ids if group_id))
+
+def _aggregate(rows, key_of, normalized):
+    """Sum (amount, count) per key alongside the rows' converted amounts."""
+    totals = {}
+    for row, converted in zip(rows, normalized):
+        key = key_of(row)
+        amount, count, total_converted = totals.get(key, (0.0, 0, 0.0))
+        totals[key] = (amount + float(row[-2] or 0), count + int(row[-1]), total_converted + converted)
+    return totals
+
+def group_split_analytics(group_id, currency):
+    """Aggregate a group's bill splits per member, category, month and currency.
+
+    Raw amounts stay keyed by their own currency; each breakdown also carries
+    a normalized amount in currency, converted at each bill's date.
+    """
+    day = db.func.date(BillSplit.created_at)
+    members = db.session.query(
+        SplitParticipant.user_id,
+        User.name,
+        BillSplit.currency,
+        day,
+        db.func.sum(SplitParticipant.paid_amount),
+        db.func.sum(SplitParticipant.share_amount),
+        db.func.count(SplitParticipant.my_row_id)
+    ).join(
+        BillSplit, BillSplit.id == SplitParticipant.bill_split_id
+    ).outerjoin(
+        User, User.id == SplitParticipant.user_id
+    ).filter(
+        BillSplit.group_id == group_id
+    ).group_by(SplitParticipant.user_id, User.name, BillSplit.currency, day).all()
+
+    bills = db.session.query(
+        BillSplit.category,
+        BillSplit.currency,
+        day,
+        db.func.sum(BillSplit.total_amount),
+        db.func.count(BillSplit.id)
+    ).filter(
+        BillSplit.group_id == group_id
+    ).group_by(BillSplit.category, BillSplit.currency, day).all()
+
+    today = date.today()
+    member_days = [to_date(row[3]) if row[3] else today for row in members]
+    member_currencies = [row[2] for row in members]
+    paid = convert_amounts([row[4] or 0 for row in members], member_currencies, member_days, currency)
+    share = convert_amounts([row[5] or 0 for row in members], member_currencies, member_days, currency)
+    bill_days = [to_date(row[2]) if row[2] else today for row in bills]
+    normalized = convert_amounts([row[3] or 0 for row in bills], [row[1] for row in bills], bill_days, currency)
+
+    per_member = {}
+    for row in members:
+        user_id, name, bill_currency = row[0], row[1], row[2]
+        entry = per_member.setdefault((user_id, bill_currency), {
+            "user_id": user_id,
+            "name": name or "Unknown",
+            "currency": bill_currency,
+            "paid": 0.0,
+            "share": 0.0,
+            "bill_count": 0
+        })
+        entry["paid"] += float(row[4] or 0)
+        entry["share"] += float(row[5] or 0)
+        entry["bill_count"] += int(row[6])
+
+    balances = {}
+    for row, paid_converted, share_converted in zip(members, paid, share):
+        name, total_paid, total_share = balances.get(row[0], (row[1] or "Unknown", 0.0, 0.0))
+        balances[row[0]] = (name, total_paid + paid_converted, total_share + share_converted)
+
+    categories = _aggregate(bills, lambda row: (row[0], row[1]), normalized)
+    months = _aggregate(
+        [row for row in bills if row[2]],
+        lambda row: (to_date(row[2]).strftime('%Y-%m'), row[1]),
+        [value for row, value in zip(bills, normalized) if row[2]]
+    )
+    currencies = _aggregate(bills, lambda row: row[1], normalized)
+
+    return {
+        "group_id": group_id,
+        "reporting_currency": currency,
+        "bill_count": sum(count for _, count, _ in currencies.values()),
+        "total": money(sum(converted for _, _, converted in currencies.values())),
+        "members": sorted([
+            {**entry, "paid": round(entry["paid"], 2), "share": round(entry["share"], 2),
+             "balance": round(entry["paid"] - entry["share"], 2)}
+            for entry in per_member.values()
+        ], key=lambda item: (item["currency"] or '', -item["paid"])),
+        "balances": sorted([
+            {
+                "user_id": user_id,
+                "name": name,
+                "paid": money(total_paid),
+                "share": money(total_share),
+                "balance": money(total_paid - total_share)
+            }
+            for user_id, (name, total_paid, total_share) in balances.items()
+        ], key=lambda item: item["balance"] if item["balance"] is not None else 0, reverse=True),
+        "categories": sorted([
+            {
+                "category": category or "Uncategorized",
+                "currency": bill_currency,
+                "amount": round(amount, 2),
+                "normalized_amount": money(converted),
+                "bill_count": count
+            }
+            for (category, bill_currency), (amount, count, converted) in categories.items()
+        ], key=lambda item: (item["currency"] or '', -item["amount"])),
+        "months": sorted([
+            {
+                "month": month,
+                "currency": bill_currency,
+                "amount": round(amount, 2),
+                "normalized_amount": money(converted),
+                "bill_count": count
+            }
+            for (month, bill_currency), (amount, count, converted) in months.items()
+        ], key=lambda item: (item["month"], item["currency"] or '')),
+        "currencies": [
+            {"currency": bill_currency, "amount": round(amount, 2), "normalized_amount": money(converted), "bill_count": count}
+            for bill_currency, (amount, count, converted) in sorted(currencies.items(), key=lambda item: item[0] or '')
+        ]
+    }
+
+def split_volume_stats(date_from, date_to, currency):
+    """Count and sum bill splits created in a window by category, currency, status and day.
+
+    One grouped query feeds every breakdown; amounts are also normalized to
+    currency at each bill's date.
+    """
+    filters = [BillSplit.created_at >= date_from]
+    if date_to:
+        filters.append(BillSplit.created_at < date_to + timedelta(days=1))
+
+    day = db.func.date(BillSplit.created_at)
+    rows = db.session.query(
+        BillSplit.category,
+        BillSplit.currency,
+        BillSplit.status,
+        day,
+        db.func.sum(BillSplit.total_amount),
+        db.func.count(BillSplit.id)
+    ).filter(*filters).group_by(BillSplit.category, BillSplit.currency, BillSplit.status, day).all()
+    rows = [(category, bill_currency, status, to_date(bill_day), total, count) for category, bill_currency, status, bill_day, total, count in rows]
+    normalized = convert_amounts([row[4] or 0 for row in rows], [row[1] for row in rows], [row[3] for row in rows], currency)
+
+    def breakdown(name, key_of):
+        totals = _aggregate(rows, key_of, normalized)
+        result = []
+        for key, (amount, count, converted) in sorted(totals.items(), key=lambda item: tuple(str(k or '') for k in item[0])):
+            value, bill_currency = key
+            result.append({
+                name: value,
+                "currency": bill_currency,
+                "count": count,
+                "amount": round(amount, 2),
+                "normalized_amount": money(converted)
+            })
+        return result
+
+    return {
+        "from": date_from.strftime('%Y-%m-%d'),
+        "to": date_to.strftime('%Y-%m-%d') if date_to else None,
+        "reporting_currency": currency,
+        "total": money(normalized.sum()) if len(rows) else 0.0,
+        "by_category": breakdown('category', lambda row: (row[0], row[1])),
+        "by_currency": breakdown('currency', lambda row: (row[1], row[1])),
+        "by_status": breakdown('status', lambda row: (row[2], row[1])),
+        "by_day": breakdown('day', lambda row: (row[3].strftime('%Y-%m-%d'), row[1]))
+    }
+
+def score_splits(bill_split_ids):
+    """Store each split's risk score: its amount relative to the average split of the same category and currency.
+
+    Scores are computed when a split is flagged or edited while flagged, so the
+    moderation queue can page through them with an index instead of averaging
+    every split on each load. Only the categories of the given splits are averaged.
+    """
+    if not bill_split_ids:
+        return
+    category_key = db.func.coalesce(BillSplit.category, '')
+    splits = db.session.query(BillSplit.id, category_key, BillSplit.currency, BillSplit.total_amount).filter(
+        BillSplit.id.in_(bill_split_ids)
+    ).all()
+    keys = {(category, currency) for _, category, currency, _ in splits if currency is not None}
+    averages = {}
+    if keys:
+        averages = {
+            (category, currency): avg_amount
+            for category, currency, avg_amount in db.session.query(
+                category_key, BillSplit.currency, db.func.avg(BillSplit.total_amount)
+            ).filter(
+                category_key.in_({category for category, _ in keys}),
+                BillSplit.currency.in_({currency for _, currency in keys})
+            ).group_by(category_key, BillSplit.currency).all()
+        }
+    db.session.bulk_update_mappings(BillSplit, [
+        {
+            "id": split_id,
+            "risk_score": float(total_amount) / float(averages[(category, currency)]) if averages.get((category, currency)) else None
+        }
+        for split_id, category, currency, total_amount in splits
+    ])
+
+def moderation_queue(page=1, per_page=MODERATION_PAGE_SIZE):
+    """Return flagged splits, riskiest first, with their total count.
+
+    Reads the risk scores stored by score_splits, so the page comes straight
+    off the (flagged, risk_score, created_at) index.
+    """
+    query = BillSplit.query.filter(BillSplit.flagged == True)
+    total = query.count()
+    rows = query.order_by(
+        BillSplit.risk_score.desc(), BillSplit.created_at.desc()
+    ).offset((page - 1) * per_page).limit(per_page).all()
+    return rows, total
+
+def set_splits_flagged(bill_split_ids, flagged):
+    """Flag or unflag many splits with one set-based UPDATE; returns the rows changed.
+
+    Flagged splits are (re)scored for the moderation queue.
+    """
+    updated = BillSplit.query.filter(
+        BillSplit.id.in_(bill_split_ids),
+        BillSplit.flagged != flagged
+    ).update({BillSplit.flagged: flagged}, synchronize_session=False)
+    if flagged:
+        score_splits(bill_split_ids)
+    return updated
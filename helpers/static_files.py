@@ -0,0 +1,53 @@
+import mimetypes
+import os
+from flask import abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+from helpers.images import CONTENT_NAME, resolve_upload
+
+OFFLOAD_HEADERS = {'x-accel': 'X-Accel-Redirect', 'x-sendfile': 'X-Sendfile'}
+
+def send_upload(filename):
+    """Serve an uploaded file with caching headers suited to its name.
+
+    Content-hashed names never change bytes, so they get a strong ETag and a
+    year-long immutable Cache-Control. A thumbnail still being rendered
+    falls back to the original with no-cache, so clients pick up the
+    thumbnail on their next revalidation. Other names get a short max-age.
+    Range and conditional requests are answered by send_file, or by the
+    proxy when UPLOAD_SENDFILE hands the bytes off via X-Accel-Redirect or
+    X-Sendfile.
+    """
+    folder = current_app.config['UPLOAD_FOLDER']
+    stored = resolve_upload(folder, filename)
+    path = safe_join(folder, stored) if stored else None
+    if not path or not os.path.isfile(path):
+        abort(404)
+
+    hashed = CONTENT_NAME.match(stored)
+    etag = stored.rsplit('.', 1)[0] if hashed else None
+    offload = OFFLOAD_HEADERS.get(current_app.config['UPLOAD_SENDFILE'])
+    if offload:
+        if etag and request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(mimetype=mimetypes.guess_type(stored)[0])
+            if offload == 'X-Accel-Redirect':
+                response.headers[offload] = f"{current_app.config['UPLOAD_ACCEL_PREFIX'].rstrip('/')}/{stored}"
+            else:
+                response.headers[offload] = os.path.abspath(path)
+        if etag:
+            response.set_etag(etag)
+    else:
+        response = send_from_directory(folder, stored, etag=etag or True, conditional=True)
+
+    response.cache_control.public = True
+    if stored != filename:
+        response.cache_control.no_cache = True
+        return response
+    response.cache_control.no_cache = None
+    if hashed:
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = current_app.config['UPLOAD_CACHE_MAX_AGE']
+    return response
@@ -1,7 +1,9 @@
 import re
 import jwt
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from flask import current_app
+from sqlalchemy import insert
+from db import db
 
 def is_valid_email(email):
     regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
@@ -32,3 +34,75 @@ def decode_token(token):
     except jwt.InvalidTokenError as e:
         print("Invalid Token Error:", e)  # Log the error for debugging
         return {"error": "Invalid token."}
+
+GRANULARITIES = ('day', 'week', 'month', 'year')
+
+def parse_report_params(args, default_days):
+    """Read from/to (YYYY-MM-DD) and granularity query args into a normalized window."""
+    date_to = args.get('to')
+    date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    date_from = args.get('from')
+    if date_from:
+        date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
+    else:
+        date_from = (date_to or date.today()) - timedelta(days=default_days)
+    if date_to and date_from > date_to:
+        raise ValueError("'from' must not be after 'to'")
+    granularity = args.get('granularity') or None
+    if granularity and granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity. Use: {', '.join(GRANULARITIES)}")
+    return date_from, date_to, granularity
+
+def period_start(granularity, day):
+    """Return the first day of the day/week/month/year bucket containing day."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'year':
+        return date(day.year, 1, 1)
+    return day
+
+def insert_ignore(table):
+    """Build an INSERT that skips rows whose key already exists, per dialect."""
+    stmt = insert(table)
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        return stmt.prefix_with('IGNORE')
+    if dialect == 'sqlite':
+        return stmt.prefix_with('OR IGNORE')
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table).on_conflict_do_nothing()
+    return stmt
+
+def insert_or_update(table, key_columns, update_columns, increment=False):
+    """Build an INSERT that updates update_columns on the existing row when key_columns collide, per dialect.
+
+    With increment the incoming values are added to the stored ones instead of replacing them.
+    """
+    def merged(column, incoming):
+        return table.c[column] + incoming if increment else incoming
+
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        return stmt.on_duplicate_key_update({
+            column: merged(column, stmt.inserted[column]) for column in update_columns
+        })
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: merged(column, stmt.excluded[column]) for column in update_columns}
+        )
+    return insert(table)
+
+def insert_increment(table, key_columns, increment_columns):
+    """Build an INSERT that adds increment_columns onto the existing row when key_columns collide, per dialect."""
+    return insert_or_update(table, key_columns, increment_columns, increment=True)
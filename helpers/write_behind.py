@@ -0,0 +1,145 @@
+import atexit
+import os
+import threading
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import and_, case, or_, update
+from db import db
+from models.user import User
+from models.user_activity import UserActivity
+
+MAX_RETRY_BACKOFF = 60  # Seconds
+
+class WriteBehindBuffer:
+    """Coalesce last_login and last-seen timestamps in memory and flush them in bulk.
+
+    Each key keeps only its newest timestamp. A background thread flushes
+    every flush_interval seconds, sooner once max_entries keys are pending,
+    and once more at interpreter exit. Every flush is one UPDATE for logins
+    plus one per day of activity, and never moves a timestamp backwards.
+    After a failed flush the thread backs off exponentially (up to
+    MAX_RETRY_BACKOFF seconds) instead of retrying on every full buffer.
+    """
+
+    def __init__(self, app, flush_interval=5, max_entries=500):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self._logins = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._failures = 0
+        self._thread = None
+        self._pid = None
+        atexit.register(self.stop)
+
+    def _ensure_thread(self):
+        # Started lazily and per process, so a pre-forking server gets one flusher per worker.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def _record(self, pending, key, when):
+        with self._lock:
+            self._ensure_thread()
+            if key not in pending or pending[key] < when:
+                pending[key] = when
+            full = len(self._logins) + len(self._seen) >= self.max_entries
+        if full:
+            self._wake.set()
+
+    def _requeue(self, logins, seen):
+        # Put back entries from a failed flush without waking the flusher, which would retry at once.
+        with self._lock:
+            for pending, entries in ((self._logins, logins), (self._seen, seen)):
+                for key, when in entries.items():
+                    if key not in pending or pending[key] < when:
+                        pending[key] = when
+
+    def record_login(self, user_id, when):
+        self._record(self._logins, user_id, when)
+
+    def record_seen(self, user_id, when):
+        self._record(self._seen, (user_id, when.date()), when)
+
+    def pending(self):
+        with self._lock:
+            return len(self._logins) + len(self._seen)
+
+    def flush(self):
+        """Write everything pending; on failure the entries are kept for the next flush."""
+        with self._lock:
+            logins, self._logins = self._logins, {}
+            seen, self._seen = self._seen, {}
+        if not logins and not seen:
+            return 0
+
+        with self.app.app_context():
+            try:
+                if logins:
+                    db.session.execute(
+                        update(User).where(User.id.in_(logins.keys())).values(last_login=case(
+                            *[
+                                (and_(User.id == user_id, or_(User.last_login.is_(None), User.last_login < when)), when)
+                                for user_id, when in logins.items()
+                            ],
+                            else_=User.last_login
+                        )).execution_options(synchronize_session=False)
+                    )
+                by_day = defaultdict(dict)
+                for (user_id, day), when in seen.items():
+                    by_day[day][user_id] = when
+                for day, users in by_day.items():
+                    db.session.execute(
+                        update(UserActivity).where(
+                            UserActivity.day == day,
+                            UserActivity.user_id.in_(users.keys())
+                        ).values(last_seen_at=case(
+                            *[
+                                (and_(UserActivity.user_id == user_id, UserActivity.last_seen_at < when), when)
+                                for user_id, when in users.items()
+                            ],
+                            else_=UserActivity.last_seen_at
+                        )).execution_options(synchronize_session=False)
+                    )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.warning(f"Write-behind flush failed, retrying later: {e}")
+                self._failures += 1
+                self._requeue(logins, seen)
+                return 0
+            finally:
+                db.session.remove()
+        self._failures = 0
+        return len(logins) + len(seen)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if self._failures:
+                self._stopping.wait(min(self.flush_interval * 2 ** min(self._failures, 10), MAX_RETRY_BACKOFF))
+
+    def stop(self):
+        """Stop the flusher and write whatever is still pending."""
+        self._stopping.set()
+        self._wake.set()
+        self.flush()
+
+def init_write_behind(app):
+    """Attach the timestamp write-behind buffer to the app."""
+    buffer = WriteBehindBuffer(
+        app,
+        flush_interval=app.config['WRITE_BEHIND_FLUSH_SECONDS'],
+        max_entries=app.config['WRITE_BEHIND_MAX_ENTRIES']
+    )
+    app.extensions['write_behind'] = buffer
+    return buffer
+
+def get_write_behind():
+    return current_app.extensions['write_behind']
@@ -0,0 +1,43 @@
+from db import db
+from datetime import datetime
+
+class AllocationRule(db.Model):
+    __tablename__ = 'allocation_rules'
+    __table_args__ = (
+        db.Index('ix_allocation_rules_user_priority', 'user_id', 'priority'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    goal_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(10), nullable=False, default='percent')
+    value = db.Column(db.Float, nullable=False)
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, user_id, goal_id, kind, value, priority=0):
+        self.validate_inputs(kind, value, priority)
+        self.user_id = user_id
+        self.goal_id = goal_id
+        self.kind = kind
+        self.value = value
+        self.priority = priority
+
+    def validate_inputs(self, kind, value, priority):
+        if kind not in ('percent', 'fixed'):
+            raise ValueError("Kind must be 'percent' or 'fixed'.")
+        if not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError("Value must be a positive number.")
+        if kind == 'percent' and value > 100:
+            raise ValueError("Percent value cannot exceed 100.")
+        if not isinstance(priority, int):
+            raise ValueError("Priority must be an integer.")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "goal_id": self.goal_id,
+            "kind": self.kind,
+            "value": self.value,
+            "priority": self.priority
+        }
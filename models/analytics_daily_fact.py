@@ -0,0 +1,16 @@
+from db import db
+
+class AnalyticsDailyFact(db.Model):
+    __tablename__ = 'analytics_daily_facts'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'type', 'category', 'profession', name='uq_analytics_daily_facts_key'),
+        db.Index('ix_analytics_daily_facts_type_day', 'type', 'day'),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    day = db.Column(db.Date, nullable=False)
+    type = db.Column(db.String(10), nullable=False)
+    category = db.Column(db.String(50), nullable=False, default='')
+    profession = db.Column(db.String(100), nullable=False, default='')
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    txn_count = db.Column(db.Integer, nullable=False, default=0)
@@ -3,6 +3,9 @@ from datetime import datetime
 
 class BillSplit(db.Model):
     __tablename__ = 'bill_splits'
+    __table_args__ = (
+        db.Index('ix_bill_splits_flagged_risk', 'flagged', 'risk_score', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False)
@@ -17,6 +20,7 @@ class BillSplit(db.Model):
     is_recurring = db.Column(db.Boolean, default=False, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=True)
     flagged = db.Column(db.Boolean, default=False, nullable=False)
+    risk_score = db.Column(db.Float, nullable=True)  # Set by score_splits while flagged
     
     participants = db.relationship('SplitParticipant', backref='bill_split', lazy=True)
 
@@ -0,0 +1,53 @@
+from db import db
+from datetime import datetime
+
+class Budget(db.Model):
+    __tablename__ = 'budgets'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'category', 'period', name='uq_budgets_user_category_period'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    period = db.Column(db.String(10), nullable=False, default='monthly')
+    limit = db.Column('limit_amount', db.Float, nullable=False)
+    spent = db.Column(db.Float, nullable=False, default=0.0)
+    period_start = db.Column(db.Date, nullable=False)
+    alert_threshold = db.Column(db.Float, nullable=False, default=0.8)
+    alert_level = db.Column(db.Float, nullable=False, default=0.0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, user_id, category, limit, period_start, period='monthly', alert_threshold=0.8):
+        self.validate_inputs(category, limit, period, alert_threshold)
+        self.user_id = user_id
+        self.category = category
+        self.limit = limit
+        self.period = period
+        self.period_start = period_start
+        self.alert_threshold = alert_threshold
+        self.spent = 0.0
+        self.alert_level = 0.0
+
+    def validate_inputs(self, category, limit, period, alert_threshold):
+        if not category or not isinstance(category, str) or len(category.strip()) == 0:
+            raise ValueError("Category must be a non-empty string.")
+        if not isinstance(limit, (int, float)) or limit <= 0:
+            raise ValueError("Limit must be a positive number.")
+        if period not in ('weekly', 'monthly'):
+            raise ValueError("Period must be 'weekly' or 'monthly'.")
+        if not isinstance(alert_threshold, (int, float)) or not 0 < alert_threshold <= 1:
+            raise ValueError("Alert threshold must be between 0 and 1.")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "category": self.category,
+            "period": self.period,
+            "limit": float(self.limit),
+            "spent": float(self.spent),
+            "remaining": float(self.limit) - float(self.spent),
+            "period_start": self.period_start.strftime('%Y-%m-%d'),
+            "alert_threshold": self.alert_threshold
+        }
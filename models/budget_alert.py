@@ -0,0 +1,31 @@
+from db import db
+from datetime import datetime
+
+class BudgetAlert(db.Model):
+    __tablename__ = 'budget_alerts'
+    __table_args__ = (
+        db.Index('ix_budget_alerts_user_delivered', 'user_id', 'delivered'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    budget_id = db.Column(db.Integer, db.ForeignKey('budgets.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    level = db.Column(db.String(20), nullable=False)
+    spent = db.Column(db.Float, nullable=False)
+    limit = db.Column('limit_amount', db.Float, nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    delivered = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "budget_id": self.budget_id,
+            "category": self.category,
+            "level": self.level,
+            "spent": float(self.spent),
+            "limit": float(self.limit),
+            "period_start": self.period_start.strftime('%Y-%m-%d'),
+            "created_at": self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
+        }
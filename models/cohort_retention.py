@@ -0,0 +1,10 @@
+from db import db
+
+class CohortRetention(db.Model):
+    __tablename__ = 'cohort_retention'
+
+    cohort_week = db.Column(db.Date, primary_key=True)
+    week_offset = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    cohort_size = db.Column(db.Integer, nullable=False)
+    active_users = db.Column(db.Integer, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False)
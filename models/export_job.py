@@ -0,0 +1,33 @@
+from db import db
+from datetime import datetime
+
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    report_type = db.Column(db.String(30), nullable=False)
+    format = db.Column(db.String(10), nullable=False)
+    date_from = db.Column(db.Date, nullable=False)
+    date_to = db.Column(db.Date, nullable=True)
+    by_day = db.Column(db.Boolean, default=False, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    file_path = db.Column(db.String(255), nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def download_name(self):
+        extension = 'csv' if self.format == 'csv' else 'xlsx'
+        return f"financial_{self.report_type}_report.{extension}"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "report_type": self.report_type,
+            "format": self.format,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None,
+            "finished_at": self.finished_at.strftime('%Y-%m-%d %H:%M:%S') if self.finished_at else None
+        }
@@ -0,0 +1,15 @@
+from db import db
+
+class FxRate(db.Model):
+    __tablename__ = 'fx_rates'
+
+    day = db.Column(db.Date, primary_key=True)
+    currency = db.Column(db.String(10), primary_key=True)
+    rate = db.Column(db.Float, nullable=False)  # Units of currency per one unit of FX_BASE_CURRENCY
+
+    def to_dict(self):
+        return {
+            "day": self.day.strftime('%Y-%m-%d'),
+            "currency": self.currency,
+            "rate": self.rate
+        }
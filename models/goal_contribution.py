@@ -0,0 +1,26 @@
+from db import db
+from datetime import datetime
+
+class GoalContribution(db.Model):
+    __tablename__ = 'goal_contributions'
+    __table_args__ = (
+        db.Index('ix_goal_contributions_user_created', 'user_id', 'created_at'),
+        db.Index('ix_goal_contributions_goal_created', 'goal_id', 'created_at'),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    goal_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    backfilled = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "goal_id": self.goal_id,
+            "user_id": self.user_id,
+            "amount": float(self.amount),
+            "created_at": self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            "backfilled": self.backfilled
+        }
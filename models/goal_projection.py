@@ -0,0 +1,25 @@
+from db import db
+
+class GoalProjection(db.Model):
+    __tablename__ = 'goal_projections'
+    __table_args__ = (
+        db.Index('ix_goal_projections_user_computed', 'user_id', 'computed_on'),
+    )
+
+    goal_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    required_monthly = db.Column(db.Float, nullable=False)
+    monthly_pace = db.Column(db.Float, nullable=False)
+    projected_completion = db.Column(db.Date, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    computed_on = db.Column(db.Date, nullable=False)
+
+    def to_dict(self):
+        return {
+            "goal_id": self.goal_id,
+            "required_monthly": self.required_monthly,
+            "monthly_pace": self.monthly_pace,
+            "projected_completion": self.projected_completion.strftime('%Y-%m-%d') if self.projected_completion else None,
+            "status": self.status,
+            "on_track": self.status != 'at_risk'
+        }
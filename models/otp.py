@@ -1,8 +1,17 @@
 from db import db
+from helpers.utils import insert_or_update
 import datetime
 import random
 
+PURGE_ON_ISSUE = 50  # Expired codes cleared by each issue() so the table stays small between purge-otps runs
+
 class OTP(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('email', name='uq_otp_email'),
+        db.Index('ix_otp_email_created', 'email', 'created_at'),
+        db.Index('ix_otp_expires_at', 'expires_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), nullable=False)
     code = db.Column(db.String(6), nullable=False)
@@ -19,4 +28,39 @@ class OTP(db.Model):
         return datetime.datetime.utcnow() > self.expires_at
 
     def is_valid(self, code):
-        return not self.is_expired() and self.code == code
\ No newline at end of file
+        return not self.is_expired() and self.code == code
+
+    @classmethod
+    def issue(cls, email):
+        """Replace the email's outstanding code with a fresh one in the caller's transaction.
+
+        A single upsert on the unique email, so concurrent requests for one
+        address can't leave two codes behind. Also clears a small batch of
+        expired codes from other addresses.
+        """
+        otp = cls(email)
+        expired = [
+            row.id for row in db.session.query(cls.id).filter(
+                cls.expires_at < otp.created_at
+            ).order_by(cls.id).limit(PURGE_ON_ISSUE).all()
+        ]
+        if expired:
+            cls.query.filter(cls.id.in_(expired)).delete(synchronize_session=False)
+        db.session.execute(
+            insert_or_update(cls.__table__, ('email',), ('code', 'created_at', 'expires_at')),
+            {"email": otp.email, "code": otp.code, "created_at": otp.created_at, "expires_at": otp.expires_at}
+        )
+        return otp
+
+    @classmethod
+    def purge_expired(cls, chunk_size=1000):
+        """Delete expired codes in bounded chunks so no single statement holds long locks."""
+        purged = 0
+        now = datetime.datetime.utcnow()
+        while True:
+            ids = [row.id for row in db.session.query(cls.id).filter(cls.expires_at < now).limit(chunk_size).all()]
+            if not ids:
+                return purged
+            cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            purged += len(ids)
@@ -0,0 +1,22 @@
+from db import db
+
+class SavingsRollup(db.Model):
+    __tablename__ = 'savings_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period', 'period_start', name='uq_savings_rollups_user_period_start'),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    period = db.Column(db.String(10), nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    contribution_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "period": self.period,
+            "period_start": self.period_start.strftime('%Y-%m-%d'),
+            "total": float(self.total),
+            "contribution_count": self.contribution_count
+        }
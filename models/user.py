@@ -1,23 +1,9 @@
 from db import db
 import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-import os
-from werkzeug.utils import secure_filename
+from helpers.passwords import hash_password, verify_password
+from helpers.images import thumbnail_url
 import random
 
-def save_profile_picture(file):
-    upload_folder = os.path.join(os.getcwd(), 'Uploads')
-    
-    if not os.path.exists(upload_folder):
-        os.makedirs(upload_folder)
-    
-    filename = secure_filename(file.filename)
-    
-    file_path = os.path.join(upload_folder, filename)
-    file.save(file_path)
-    
-    return file_path
-
 def generate_unique_user_id():
     """Generate a unique 6-digit user ID (100000 to 999999)."""
     max_attempts = 100  # Limit attempts to prevent infinite loops
@@ -53,10 +39,10 @@ class User(db.Model):
         self.is_banned = is_banned
 
     def _generate_password_hash(self, password):
-        return generate_password_hash(password, method='pbkdf2:sha256')
+        return hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
 
     def to_dict(self):
         return {
@@ -65,6 +51,7 @@ class User(db.Model):
             "email": self.email,
             "profession": self.profession,
             "profilePicture": self.profile_picture,
+            "profilePictureThumbnail": thumbnail_url(self.profile_picture, 128),
             "isAdmin": self.is_admin,
             "lastLogin": self.last_login.strftime('%Y-%m-%d %H:%M:%S') if self.last_login else None,
             "isBanned": self.is_banned
@@ -0,0 +1,12 @@
+from db import db
+
+class UserActivity(db.Model):
+    __tablename__ = 'user_activity'
+    __table_args__ = (
+        db.Index('ix_user_activity_day', 'day'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+    first_seen_at = db.Column(db.DateTime, nullable=False)
+    last_seen_at = db.Column(db.DateTime, nullable=False)
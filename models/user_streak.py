@@ -0,0 +1,23 @@
+from db import db
+from datetime import datetime
+
+class UserStreak(db.Model):
+    __tablename__ = 'user_streaks'
+    __table_args__ = (
+        db.Index('ix_user_streaks_current', 'current_streak', 'last_active_period'),
+        db.Index('ix_user_streaks_longest', 'longest_streak'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, autoincrement=False)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_active_period = db.Column(db.Date, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self, current_streak=None):
+        return {
+            "user_id": self.user_id,
+            "current_streak": self.current_streak if current_streak is None else current_streak,
+            "longest_streak": self.longest_streak,
+            "last_active_period": self.last_active_period.strftime('%Y-%m') if self.last_active_period else None
+        }
@@ -5,6 +5,8 @@ from routes.savings_goal_routes import savings_goal_bp
 from routes.admin_routes import admin_bp 
 from routes.analytics_routes import analytics_bp  
 from routes.bill_split_routes import bill_split_bp  
+from routes.budget_routes import budget_bp
+from routes.metrics_routes import metrics_bp
 
 def register_routes(app):
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -13,4 +15,6 @@ def register_routes(app):
     app.register_blueprint(savings_goal_bp, url_prefix='/api')  
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
-    app.register_blueprint(bill_split_bp, url_prefix='/api/splits')  
\ No newline at end of file
+    app.register_blueprint(bill_split_bp, url_prefix='/api/splits')  
+    app.register_blueprint(budget_bp, url_prefix='/api/budgets')
+    app.register_blueprint(metrics_bp)
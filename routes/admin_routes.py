@@ -1,11 +1,24 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from models.bill_split import BillSplit
 from models.split_participant import SplitParticipant
 from models.group import Group
 from models.group_member import GroupMember
+from models.user_activity import UserActivity
+from models.budget import Budget
+from models.budget_alert import BudgetAlert
+from models.goal_contribution import GoalContribution
+from models.savings_rollup import SavingsRollup
+from models.user_streak import UserStreak
+from models.goal_projection import GoalProjection
+from models.allocation_rule import AllocationRule
+from models.export_job import ExportJob
 from db import db
+from sqlalchemy import delete
+from helpers.cache import cached_result, invalidate_on_commit
+from helpers.split_analytics import MODERATION_PAGE_SIZE, split_volume_stats, moderation_queue, set_splits_flagged
+from helpers.utils import parse_report_params
 from datetime import datetime
 import smtplib
 from email.mime.text import MIMEText
@@ -13,6 +26,19 @@ import os
 
 admin_bp = Blueprint('admin', __name__)
 
+# Rows that only exist for their user; their user.id foreign keys have no ON DELETE rule, so they go first.
+USER_OWNED_COLUMNS = (
+    UserActivity.user_id,
+    BudgetAlert.user_id,
+    Budget.user_id,
+    GoalContribution.user_id,
+    SavingsRollup.user_id,
+    UserStreak.user_id,
+    GoalProjection.user_id,
+    AllocationRule.user_id,
+    ExportJob.created_by,
+)
+
 def admin_required():
     def wrapper(fn):
         @jwt_required()
@@ -151,7 +177,10 @@ def delete_user(user_id):
         user = User.query.get(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
+        for column in USER_OWNED_COLUMNS:
+            db.session.execute(delete(column.class_).where(column == user_id))
         db.session.delete(user)
+        invalidate_on_commit('engagement')
         db.session.commit()
         return jsonify({"message": "User deleted"}), 200
     except Exception as e:
@@ -192,13 +221,67 @@ def flag_bill_split(bill_split_id):
         flagged = data.get('flagged')
         if flagged is None:
             return jsonify({"error": "Flagged status is required"}), 400
-        bill_split.flagged = bool(flagged)
+        set_splits_flagged([bill_split.id], bool(flagged))
         db.session.commit()
         return jsonify({"message": "Bill split flag status updated", "bill_split": bill_split.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to update bill split flag status: {str(e)}"}), 500
 
+@admin_bp.route('/bill_splits/stats', methods=['GET'], endpoint='get_bill_split_stats')
+@admin_required()
+def get_bill_split_stats():
+    try:
+        date_from, date_to, _ = parse_report_params(request.args, default_days=30)
+        currency = (request.args.get('currency') or current_app.config['FX_REPORTING_CURRENCY']).upper()
+        stats = cached_result(
+            'splits:admin',
+            {"from": date_from, "to": date_to, "currency": currency},
+            lambda: split_volume_stats(date_from, date_to, currency)
+        )
+        return jsonify(stats), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch bill split stats: {str(e)}"}), 500
+
+@admin_bp.route('/bill_splits/moderation', methods=['GET'], endpoint='get_moderation_queue')
+@admin_required()
+def get_moderation_queue():
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', MODERATION_PAGE_SIZE)), 1), 200)
+        rows, total = moderation_queue(page, per_page)
+        queue = []
+        for split in rows:
+            split_dict = split.to_dict()
+            split_dict['risk_score'] = round(float(split.risk_score), 2) if split.risk_score is not None else None
+            queue.append(split_dict)
+        return jsonify({"bill_splits": queue, "page": page, "per_page": per_page, "total": total}), 200
+    except ValueError as ve:
+        return jsonify({"error": f"Invalid pagination parameters: {str(ve)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch moderation queue: {str(e)}"}), 500
+
+@admin_bp.route('/bill_splits/flag', methods=['PATCH'], endpoint='bulk_flag_bill_splits')
+@admin_required()
+def bulk_flag_bill_splits():
+    try:
+        data = request.get_json()
+        ids = data.get('ids')
+        flagged = data.get('flagged')
+        if not ids or not isinstance(ids, list) or flagged is None:
+            return jsonify({"error": "A non-empty ids list and flagged status are required"}), 400
+        updated = set_splits_flagged([int(i) for i in ids], bool(flagged))
+        db.session.commit()
+        return jsonify({"message": "Bill split flag status updated", "count": updated}), 200
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": f"Invalid bill split id: {str(ve)}"}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to update bill split flag status: {str(e)}"}), 500
+
 @admin_bp.route('/groups', methods=['GET'], endpoint='get_all_groups')
 @admin_required()
 def get_all_groups():
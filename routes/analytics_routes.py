@@ -1,17 +1,23 @@
-from flask import Blueprint, jsonify, request, send_file
-from flask_jwt_extended import jwt_required
+from flask import Blueprint, Response, current_app, jsonify, request, send_file, stream_with_context, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from routes.admin_routes import admin_required
-from models.transaction import Transaction
 from models.user import User
-from models.savings_goal import SavingsGoal
+from models.export_job import ExportJob
+from models.user_activity import UserActivity
 from db import db
-from sqlalchemy import func, extract
 from datetime import datetime, timedelta
-import csv
-from io import StringIO, BytesIO
-from openpyxl import Workbook
+from helpers.analytics_cube import REPORT_SPECS, financial_report, rebuild_cube
+from helpers.budgets import to_date
+from helpers.cache import cached_result
+from helpers.utils import parse_report_params, period_start
+from helpers.activity import retention_matrix, compute_cohort_retention
+from helpers.fx import load_rates_file
+from helpers.exports import EXPORT_COLUMNS, export_header, estimate_export_rows, iter_export_rows, stream_csv, write_xlsx, submit_export_job, fail_stale_export_jobs, export_file_path
+from io import BytesIO
+import click
+import os
 
-analytics_bp = Blueprint('analytics', __name__)
+analytics_bp = Blueprint('analytics', __name__, cli_group='analytics')
 
 @analytics_bp.route('/financial', methods=['GET'], endpoint='get_financial_reports')
 @jwt_required()
@@ -19,90 +25,94 @@ analytics_bp = Blueprint('analytics', __name__)
 def get_financial_reports():
     try:
         report_type = request.args.get('type', 'spendingTrends')
-        six_months_ago = datetime.now() - timedelta(days=180)
-
-        if report_type == 'spendingTrends':
-            # Category-based spending trends
-            data = db.session.query(
-                Transaction.category,
-                func.sum(Transaction.amount).label('total_amount')  
-            ).filter(
-                Transaction.type == 'expense',
-                Transaction.date >= six_months_ago
-            ).group_by(
-                Transaction.category
-            ).all()
-            result = [{"category": cat, "amount": float(amt)} for cat, amt in data]
-
-        elif report_type == 'savings':
-            data = db.session.query(
-                User.profession,
-                func.sum(SavingsGoal.progress).label('total_savings')
-            ).join(
-                SavingsGoal, User.id == SavingsGoal.user_id
-            ).filter(
-                SavingsGoal.deadline >= six_months_ago
-            ).group_by(
-                User.profession
-            ).all()
-            result = [{"profession": prof if prof else "Unknown", "amount": float(sav)} for prof, sav in data]
-
-        elif report_type == 'transactionVolume':
-            data = db.session.query(
-                Transaction.category,
-                func.count(Transaction.id).label('count')
-            ).filter(
-                Transaction.date >= six_months_ago
-            ).group_by(
-                Transaction.category
-            ).all()
-            result = [{"category": cat, "count": int(cnt)} for cat, cnt in data]
-
-        elif report_type == 'professionSpending':
-            data = db.session.query(
-                User.profession,
-                func.sum(Transaction.amount).label('total_spent')
-            ).join(
-                Transaction, User.id == Transaction.user_id
-            ).filter(
-                Transaction.type == 'expense',
-                Transaction.date >= six_months_ago
-            ).group_by(
-                User.profession
-            ).all()
-            result = [{"profession": prof if prof else "Unknown", "amount": float(spent)} for prof, spent in data]
-
-        else:
+        date_from, date_to, granularity = parse_report_params(request.args, default_days=180)
+        if report_type not in REPORT_SPECS:
             return jsonify({"error": "Invalid report type"}), 400
 
+        result = cached_result(
+            'financial',
+            {"type": report_type, "from": date_from, "to": date_to, "granularity": granularity},
+            lambda: financial_report(report_type, date_from, date_to, granularity)
+        )
         return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to fetch financial reports: {str(e)}"}), 500
 
+def engagement_metrics(date_from=None, date_to=None, granularity=None):
+    """Return engagement metrics for a window, or a per-period series with granularity."""
+    window_start = datetime.combine(date_from, datetime.min.time()) if date_from else datetime.utcnow() - timedelta(days=30)
+    window_end = datetime.combine(date_to + timedelta(days=1), datetime.min.time()) if date_to else None
+    signup_filters = [User.created_at >= window_start] + ([User.created_at < window_end] if window_end else [])
+    activity_filters = [UserActivity.day >= window_start.date()] + ([UserActivity.day < window_end.date()] if window_end else [])
+    # last_login covers activity from before user_activity was tracked.
+    login_filters = [User.last_login >= window_start] + ([User.last_login < window_end] if window_end else [])
+
+    if granularity:
+        series = {}
+        signups = db.session.query(db.func.date(User.created_at), db.func.count(User.id)).filter(
+            *signup_filters
+        ).group_by(db.func.date(User.created_at)).all()
+        for day, count in signups:
+            period = period_start(granularity, to_date(day)).strftime('%Y-%m-%d')
+            series.setdefault(period, {"period": period, "active_users": 0, "new_signups": 0})["new_signups"] += int(count)
+
+        active = db.session.query(UserActivity.day, UserActivity.user_id).filter(*activity_filters).all()
+        active += db.session.query(db.func.date(User.last_login), User.id).filter(*login_filters).all()
+        active_by_period = {}
+        for day, user_id in active:
+            period = period_start(granularity, to_date(day)).strftime('%Y-%m-%d')
+            active_by_period.setdefault(period, set()).add(user_id)
+        for period, users in active_by_period.items():
+            series.setdefault(period, {"period": period, "active_users": 0, "new_signups": 0})["active_users"] = len(users)
+        return [series[period] for period in sorted(series)]
+
+    total_users = User.query.filter(User.created_at < window_end).count() if window_end else User.query.count()
+    active_ids = db.session.query(UserActivity.user_id).filter(*activity_filters).union(
+        db.session.query(User.id).filter(*login_filters)
+    ).subquery()
+    active_users = db.session.query(db.func.count()).select_from(active_ids).scalar() or 0
+    new_signups = User.query.filter(*signup_filters).count()
+    retention_rate = f"{(active_users / total_users * 100):.1f}%" if total_users > 0 else "0%"
+
+    return [
+        {"metric": "Total Users", "value": total_users},
+        {"metric": "Active Users", "value": active_users},
+        {"metric": "New Signups" if date_from or date_to else "New Signups (Last 30 Days)", "value": new_signups},
+        {"metric": "Retention Rate", "value": retention_rate},
+    ]
+
 @analytics_bp.route('/engagement', methods=['GET'], endpoint='get_user_engagement')
 @jwt_required()
 @admin_required()
 def get_user_engagement():
     try:
-        total_users = User.query.count()
-        active_users = User.query.filter(
-            User.last_login >= (datetime.utcnow() - timedelta(days=30))
-        ).count()
-        new_signups = User.query.filter(
-            User.created_at >= (datetime.utcnow() - timedelta(days=30))
-        ).count()
-        retention_rate = f"{(active_users / total_users * 100):.1f}%" if total_users > 0 else "0%"
-
-        engagement_data = [
-            {"metric": "Total Users", "value": total_users},
-            {"metric": "Active Users", "value": active_users},
-            {"metric": "New Signups (Last 30 Days)", "value": new_signups},
-            {"metric": "Retention Rate", "value": retention_rate},
-        ]
-        return jsonify(engagement_data), 200
+        date_from, date_to, granularity = parse_report_params(request.args, default_days=30)
+        if not request.args.get('from') and not request.args.get('to') and not granularity:
+            date_from = None
+
+        result = cached_result(
+            'engagement',
+            {"from": date_from, "to": date_to, "granularity": granularity},
+            lambda: engagement_metrics(date_from, date_to, granularity)
+        )
+        return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to fetch engagement data: {str(e)}"}), 500
 
+@analytics_bp.route('/retention', methods=['GET'], endpoint='get_cohort_retention')
+@jwt_required()
+@admin_required()
+def get_cohort_retention():
+    try:
+        return jsonify(retention_matrix()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to fetch cohort retention: {str(e)}"}), 500
+
 @analytics_bp.route('/export', methods=['POST'], endpoint='export_data')
 @jwt_required()
 @admin_required()
@@ -116,82 +126,180 @@ def export_data():
         if export_type not in ['financial', 'engagement'] or format not in ['csv', 'excel']:
             return jsonify({"error": "Invalid type or format"}), 400
 
+        download_name = f"{export_type}_{report_type if export_type == 'financial' else ''}_report"
+
         if export_type == 'financial':
-            if report_type == 'spendingTrends':
-                transactions = db.session.query(Transaction).filter(
-                    Transaction.type == 'expense',
-                    Transaction.date >= datetime.now() - timedelta(days=180)
-                ).all()
-                export_data = [{"category": t.category, "amount": float(t.amount)} for t in transactions]
-            elif report_type == 'savings':
-                savings = db.session.query(User, SavingsGoal).join(
-                    SavingsGoal, User.id == SavingsGoal.user_id
-                ).filter(
-                    SavingsGoal.deadline >= datetime.now() - timedelta(days=180)
-                ).all()
-                export_data = [{"profession": u.profession if u.profession else "Unknown", "amount": float(s.progress)} for u, s in savings]
-            elif report_type == 'transactionVolume':
-                transactions = db.session.query(Transaction).filter(
-                    Transaction.date >= datetime.now() - timedelta(days=180)
-                ).all()
-                export_data = [{"category": t.category, "count": 1} for t in transactions]
-            elif report_type == 'professionSpending':
-                transactions = db.session.query(User, Transaction).join(
-                    Transaction, User.id == Transaction.user_id
-                ).filter(
-                    Transaction.type == 'expense',
-                    Transaction.date >= datetime.now() - timedelta(days=180)
-                ).all()
-                export_data = [{"profession": u.profession if u.profession else "Unknown", "amount": float(t.amount)} for u, t in transactions]
-            else:
+            if report_type not in EXPORT_COLUMNS:
                 return jsonify({"error": "Invalid financial report type"}), 400
 
+            date_from, date_to, _ = parse_report_params(data, default_days=180)
+            by_day = bool(data.get('by_day', False))
+
+            if data.get('async') or estimate_export_rows(report_type, date_from, date_to, by_day) > current_app.config['EXPORT_ASYNC_ROW_THRESHOLD']:
+                job = submit_export_job(
+                    current_app._get_current_object(), get_jwt_identity(), report_type, format, date_from, date_to, by_day
+                )
+                job_data = job.to_dict()
+                job_data["status_url"] = url_for('analytics.get_export_job', job_id=job.id)
+                return jsonify({"message": "Export queued", "job": job_data}), 202
+
+            header = export_header(report_type, by_day)
+            rows = iter_export_rows(report_type, date_from, date_to, by_day)
         else:  # engagement
-            total_users = User.query.count()
-            active_users = User.query.filter(
-                User.last_login >= (datetime.utcnow() - timedelta(days=30))
-            ).count()
-            new_signups = User.query.filter(
-                User.created_at >= (datetime.utcnow() - timedelta(days=30))
-            ).count()
-            retention_rate = f"{(active_users / total_users * 100):.1f}%" if total_users > 0 else "0%"
-            export_data = [
-                {"metric": "Total Users", "value": total_users},
-                {"metric": "Active Users", "value": active_users},
-                {"metric": "New Signups", "value": new_signups},
-                {"metric": "Retention Rate", "value": retention_rate},
-            ]
+            header = ("metric", "value")
+            rows = [(m["metric"], m["value"]) for m in engagement_metrics()]
 
         if format == 'csv':
-            output = StringIO()
-            writer = csv.DictWriter(output, fieldnames=export_data[0].keys())
-            writer.writeheader()
-            writer.writerows(export_data)
-            output.seek(0)
-            return send_file(
-                BytesIO(output.getvalue().encode('utf-8')),
+            return Response(
+                stream_with_context(stream_csv(header, rows)),
                 mimetype='text/csv',
-                as_attachment=True,
-                download_name=f"{export_type}_{report_type if export_type == 'financial' else ''}_report.csv"
+                headers={"Content-Disposition": f"attachment; filename={download_name}.csv"}
             )
 
-        elif format == 'excel':
-            wb = Workbook()
-            ws = wb.active
-            ws.title = f"{export_type}_{report_type}" if export_type == 'financial' else export_type
-            headers = list(export_data[0].keys())
-            ws.append(headers)
-            for row in export_data:
-                ws.append(list(row.values()))
-            excel_io = BytesIO()
-            wb.save(excel_io)
-            excel_io.seek(0)
-            return send_file(
-                excel_io,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                as_attachment=True,
-                download_name=f"{export_type}_{report_type if export_type == 'financial' else ''}_report.xlsx"
-            )
+        excel_io = BytesIO()
+        write_xlsx(header, rows, excel_io, f"{export_type}_{report_type}" if export_type == 'financial' else export_type)
+        excel_io.seek(0)
+        return send_file(
+            excel_io,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name=f"{download_name}.xlsx"
+        )
+
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to export data: {str(e)}"}), 500
+
+@analytics_bp.route('/export/jobs/<job_id>', methods=['GET'], endpoint='get_export_job')
+@jwt_required()
+@admin_required()
+def get_export_job(job_id):
+    try:
+        if fail_stale_export_jobs(current_app.config['EXPORT_JOB_TIMEOUT']):
+            db.session.commit()
+        job = db.session.get(ExportJob, job_id)
+        if not job:
+            return jsonify({"error": "Export job not found"}), 404
+
+        job_data = job.to_dict()
+        if job.status == 'done':
+            job_data["download_url"] = url_for('analytics.download_export', job_id=job.id)
+        return jsonify(job_data), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch export job: {str(e)}"}), 500
+
+@analytics_bp.route('/export/jobs/<job_id>/download', methods=['GET'], endpoint='download_export')
+@jwt_required()
+@admin_required()
+def download_export(job_id):
+    try:
+        job = db.session.get(ExportJob, job_id)
+        path = export_file_path(current_app, job) if job and job.status == 'done' and job.file_path else None
+        if not path or not os.path.exists(path):
+            return jsonify({"error": "Export file not available"}), 404
 
+        mimetype = 'text/csv' if job.format == 'csv' else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=job.download_name())
     except Exception as e:
-        return jsonify({"error": f"Failed to export data: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Failed to download export: {str(e)}"}), 500
+
+@analytics_bp.route('/snapshot/transactions', methods=['GET'], endpoint='query_transaction_snapshot')
+@jwt_required()
+@admin_required()
+def query_transaction_snapshot():
+    from helpers.analytics_snapshot import METRICS, GROUP_KEYS, get_snapshot  # Loads numpy; deferred to first snapshot query
+    try:
+        group_by = request.args.get('group_by')
+        metrics = tuple(m for m in request.args.get('metrics', 'count,sum').split(',') if m)
+        if group_by and group_by not in GROUP_KEYS:
+            return jsonify({"error": f"Invalid group_by. Use: {', '.join(GROUP_KEYS)}"}), 400
+        if not metrics or any(m not in METRICS for m in metrics):
+            return jsonify({"error": f"Invalid metrics. Use: {', '.join(METRICS)}"}), 400
+
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        filters = {
+            "type": request.args.get('type'),
+            "category": request.args.get('category'),
+            "profession": request.args.get('profession'),
+            "day_from": datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None,
+            "day_to": datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None,
+        }
+
+        snapshot = get_snapshot(current_app._get_current_object())
+        return jsonify({
+            "results": snapshot.query_transactions(filters, group_by, metrics),
+            "snapshot_at": datetime.utcfromtimestamp(snapshot.loaded_at).strftime('%Y-%m-%d %H:%M:%S')
+        }), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to query analytics snapshot: {str(e)}"}), 500
+
+@analytics_bp.route('/distributions', methods=['GET'], endpoint='get_spending_distributions')
+@jwt_required()
+@admin_required()
+def get_spending_distributions():
+    from helpers.analytics_snapshot import get_snapshot
+    try:
+        group_by = request.args.get('group_by', 'category')
+        if group_by not in ('category', 'profession'):
+            return jsonify({"error": "Invalid group_by. Use: category, profession"}), 400
+        bins = min(max(request.args.get('bins', 20, type=int), 1), 200)
+        top = min(max(request.args.get('top', 5, type=int), 0), 100)
+        percentiles = tuple(int(p) for p in request.args.get('percentiles', '50,90,99').split(',') if p)
+        if any(not 0 <= p <= 100 for p in percentiles):
+            return jsonify({"error": "Percentiles must be between 0 and 100"}), 400
+
+        date_from, date_to, _ = parse_report_params(request.args, default_days=180)
+        filters = {
+            "type": request.args.get('type', 'expense'),
+            "category": request.args.get('category'),
+            "profession": request.args.get('profession'),
+            "day_from": date_from,
+            "day_to": date_to,
+        }
+
+        snapshot = get_snapshot(current_app._get_current_object())
+        return jsonify({
+            "results": snapshot.distributions(filters, group_by, percentiles, bins, top),
+            "snapshot_at": datetime.utcfromtimestamp(snapshot.loaded_at).strftime('%Y-%m-%d %H:%M:%S')
+        }), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch spending distributions: {str(e)}"}), 500
+
+@analytics_bp.route('/snapshot/goals', methods=['GET'], endpoint='query_goal_snapshot')
+@jwt_required()
+@admin_required()
+def query_goal_snapshot():
+    from helpers.analytics_snapshot import get_snapshot
+    try:
+        snapshot = get_snapshot(current_app._get_current_object())
+        return jsonify({
+            "results": snapshot.goal_summary(request.args.get('group_by', 'profession')),
+            "snapshot_at": datetime.utcfromtimestamp(snapshot.loaded_at).strftime('%Y-%m-%d %H:%M:%S')
+        }), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to query analytics snapshot: {str(e)}"}), 500
+
+@analytics_bp.cli.command('rebuild-cube')
+def rebuild_cube_command():
+    """Rebuild the daily analytics fact cube from source tables."""
+    rows = rebuild_cube()
+    print(f"Wrote {rows} analytics fact rows")
+
+@analytics_bp.cli.command('load-fx-rates')
+@click.argument('path')
+def load_fx_rates_command(path):
+    """Load FX rates from a CSV file with date, currency and rate columns."""
+    rows = load_rates_file(path)
+    print(f"Loaded {rows} FX rates")
+
+@analytics_bp.cli.command('compute-retention')
+def compute_retention_command():
+    """Recompute the cohort retention matrix from daily user activity."""
+    rows = compute_cohort_retention()
+    print(f"Wrote {len(rows)} cohort retention cells")
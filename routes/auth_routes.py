@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt, get_jwt_identity
 from models.user import User
 from models.otp import OTP
 from db import db
 from datetime import datetime
 from helpers.utils import is_valid_email, is_strong_password
+from helpers.activity import record_activity
+from helpers.cache import invalidate_on_commit
+from helpers.rate_limit import rate_limit
+from helpers.passwords import get_password_service, hash_password
+from helpers.revocation import revoke_token, purge_expired_revocations
+from helpers.write_behind import get_write_behind
 import os
 import smtplib
 from email.mime.text import MIMEText
@@ -32,6 +37,7 @@ def send_otp(email, otp_code):
         return False
 
 @auth_bp.route('/send-otp', methods=['POST'])
+@rate_limit('otp-send', ip='10/hour', email='3/15 minutes')
 def send_otp_route():
     data = request.get_json()
     email = data.get('email', '').strip().lower()
@@ -45,21 +51,18 @@ def send_otp_route():
     if User.query.filter_by(email=email).first():
         return jsonify({"success": False, "message": "Email already registered."}), 409
 
-    OTP.query.filter_by(email=email).delete()
-    db.session.commit()
-
-    otp = OTP(email=email)
-    db.session.add(otp)
+    otp = OTP.issue(email)
     db.session.commit()
 
     if send_otp(email, otp.code):
         return jsonify({"success": True, "message": "OTP sent successfully."}), 200
     else:
-        db.session.delete(otp)
+        OTP.query.filter_by(email=email).delete()
         db.session.commit()
         return jsonify({"success": False, "message": "Failed to send OTP."}), 500
 
 @auth_bp.route('/send-reset-otp', methods=['POST'])
+@rate_limit('otp-send', ip='10/hour', email='3/15 minutes')
 def send_reset_otp():
     data = request.get_json()
     email = data.get('email', '').strip().lower()
@@ -74,21 +77,18 @@ def send_reset_otp():
     if not user:
         return jsonify({"success": False, "message": "Email not found."}), 404
 
-    OTP.query.filter_by(email=email).delete()
-    db.session.commit()
-
-    otp = OTP(email=email)
-    db.session.add(otp)
+    otp = OTP.issue(email)
     db.session.commit()
 
     if send_otp(email, otp.code):
         return jsonify({"success": True, "message": "OTP sent successfully."}), 200
     else:
-        db.session.delete(otp)
+        OTP.query.filter_by(email=email).delete()
         db.session.commit()
         return jsonify({"success": False, "message": "Failed to send OTP."}), 500
 
 @auth_bp.route('/verify-otp', methods=['POST'])
+@rate_limit('otp-verify', ip='30/hour', email='5/15 minutes')
 def verify_otp():
     data = request.get_json()
     email = data.get('email', '').strip().lower()
@@ -112,6 +112,7 @@ def verify_otp():
         return jsonify({"success": False, "message": "Invalid or expired OTP."}), 400
 
 @auth_bp.route('/reset-password', methods=['POST'])
+@rate_limit('otp-verify', ip='30/hour', email='5/15 minutes')
 def reset_password():
     data = request.get_json()
     email = data.get('email', '').strip().lower()
@@ -138,13 +139,14 @@ def reset_password():
     if not otp or not otp.is_valid(code):
         return jsonify({"success": False, "message": "Invalid or expired OTP."}), 400
 
-    user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+    user.password = hash_password(new_password)
     db.session.delete(otp)
     db.session.commit()
 
     return jsonify({"success": True, "message": "Password reset successfully."}), 200
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login', ip='20/minute', email='10/15 minutes')
 def login():
     data = request.get_json()
     email = data.get('email', '').strip().lower()
@@ -157,15 +159,23 @@ def login():
         return jsonify({"success": False, "message": "Invalid email format."}), 400
 
     user = User.query.filter_by(email=email).first()
-    if user and user.check_password(password):
-        user.last_login = datetime.utcnow()
-        db.session.commit()
+    valid, new_hash = get_password_service().verify_and_update(user.password, password) if user else (False, None)
+    if valid:
+        now = datetime.utcnow()
+        if new_hash:
+            user.password = new_hash  # Upgrade legacy or weaker hashes on the way in
+            db.session.commit()
+        # last_login is written behind in bulk rather than in its own transaction.
+        get_write_behind().record_login(user.id, now)
+        record_activity(user.id, now)
         token = create_access_token(identity=user.id)
-        return jsonify({"success": True, "token": token}), 200
+        refresh_token = create_refresh_token(identity=user.id)
+        return jsonify({"success": True, "token": token, "refresh_token": refresh_token}), 200
 
     return jsonify({"success": False, "message": "Invalid credentials."}), 401
 
 @auth_bp.route('/signup', methods=['POST'])
+@rate_limit('otp-verify', ip='30/hour', email='5/15 minutes')
 def signup():
     data = request.get_json()
     name = data.get('name', '').strip()
@@ -193,15 +203,53 @@ def signup():
     new_user = User(name=name, email=email, profession=profession, password=password)
     db.session.delete(otp)
     db.session.add(new_user)
+    invalidate_on_commit('engagement')
     db.session.commit()
 
     token = create_access_token(identity=new_user.id)
-    return jsonify({"success": True, "token": token, "user": new_user.to_dict()}), 201
+    refresh_token = create_refresh_token(identity=new_user.id)
+    return jsonify({"success": True, "token": token, "refresh_token": refresh_token, "user": new_user.to_dict()}), 201
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    user_id = get_jwt_identity()
+    user = db.session.get(User, user_id)
+    if not user or user.is_banned:
+        return jsonify({"success": False, "message": "User not found or banned."}), 401
+
+    # Rotate: each refresh token works once, so a leaked one is only good until its owner next refreshes.
+    if not revoke_token(get_jwt()):
+        return jsonify({"success": False, "message": "Refresh token already used."}), 401
+    token = create_access_token(identity=user_id)
+    refresh_token = create_refresh_token(identity=user_id)
+    return jsonify({"success": True, "token": token, "refresh_token": refresh_token}), 200
 
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required(optional=True)
 def logout():
     user_id = get_jwt_identity()
     if user_id:
+        revoke_token(get_jwt())
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                payload = decode_token(refresh_token)
+                if payload['sub'] == get_jwt()['sub']:
+                    revoke_token(payload)
+            except Exception as e:
+                print(f"Ignoring invalid refresh token on logout: {e}")
         print(f"User {user_id} logged out on server")
-    return jsonify({"success": True, "message": "Logged out successfully."}), 200
\ No newline at end of file
+    return jsonify({"success": True, "message": "Logged out successfully."}), 200
+
+@auth_bp.cli.command('purge-otps')
+def purge_otps_command():
+    """Delete expired OTP codes in chunks."""
+    purged = OTP.purge_expired()
+    print(f"Purged {purged} expired OTPs")
+
+@auth_bp.cli.command('purge-revoked-tokens')
+def purge_revoked_tokens_command():
+    """Delete revocations for tokens that have already expired."""
+    purged = purge_expired_revocations()
+    print(f"Purged {purged} expired token revocations")
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from db import db
 from models.group import Group
@@ -7,6 +7,10 @@ from models.bill_split import BillSplit
 from models.split_participant import SplitParticipant
 from models.settlement import Settlement
 from models.user import User
+from helpers.cache import cached_result
+from helpers.rate_limit import rate_limit
+from helpers.images import thumbnail_url
+from helpers.split_analytics import group_split_analytics, invalidate_split_analytics, score_splits
 import logging
 from datetime import datetime
 
@@ -89,6 +93,7 @@ def create_group(current_user_id):
 
 @bill_split_bp.route('/users/search', methods=['GET'], endpoint='search_users')
 @user_required()
+@rate_limit('user-search', user='60/minute', ip='120/minute')
 def search_users(current_user_id):
     try:
         query = request.args.get('q', '').strip()
@@ -116,7 +121,8 @@ def search_users(current_user_id):
                 "id": str(u.id),
                 "name": u.name,
                 "email": u.email,
-                "profilePicture": u.profile_picture
+                "profilePicture": u.profile_picture,
+                "profilePictureThumbnail": thumbnail_url(u.profile_picture, 64)
             }
             for u in users if u.id != current_user_id
         ]
@@ -137,6 +143,7 @@ def delete_bill_split(current_user_id, bill_split_id):
         SplitParticipant.query.filter_by(bill_split_id=bill_split_id).delete()
         Settlement.query.filter_by(bill_split_id=bill_split_id).delete()
         db.session.delete(bill_split)
+        invalidate_split_analytics(bill_split.group_id)
         db.session.commit()
 
         logger.info(f"Bill split deleted: id={bill_split_id}, user_id={current_user_id}")
@@ -277,6 +284,7 @@ def create_bill_split(current_user_id):
                 if not participant_ids.issubset(group_members):
                     raise ValueError("All participants must be members of the selected group")
 
+        invalidate_split_analytics(group_id)
         db.session.commit()
 
         bill_split_dict = bill_split.to_dict()
@@ -334,6 +342,7 @@ def update_bill_split(current_user_id, bill_split_id):
         if not participants or not isinstance(participants, list):
             raise ValueError("Participants must be a non-empty list")
 
+        previous_group_id = bill_split.group_id
         for participant_data in participants:
             user_id = participant_data.get('user_id')
             if not user_id:
@@ -370,7 +379,11 @@ def update_bill_split(current_user_id, bill_split_id):
             bill_split.notes = data['notes']
         if 'is_recurring' in data:
             bill_split.is_recurring = data['is_recurring']
+        if bill_split.flagged and any(field in data for field in ('total_amount', 'category', 'currency')):
+            db.session.flush()
+            score_splits([bill_split.id])
 
+        invalidate_split_analytics(previous_group_id, bill_split.group_id)
         db.session.commit()
         logger.info(f"Bill split updated: id={bill_split_id}, user_id={current_user_id}")
         return jsonify({"message": "Bill split updated", "bill_split": bill_split.to_dict()}), 200
@@ -477,6 +490,7 @@ def delete_group(current_user_id, group_id):
 
         GroupMember.query.filter_by(group_id=group_id).delete()
         group.deleted_at = datetime.utcnow()
+        invalidate_split_analytics(group_id)
         db.session.commit()
 
         logger.info(f"Group soft-deleted: id={group_id}, user_id={current_user_id}, deleted_at={group.deleted_at}")
@@ -511,6 +525,31 @@ def get_group(current_user_id, group_id):
         logger.error(f"Exception in get_group: {str(e)}")
         return jsonify({"error": f"Failed to fetch group: {str(e)}"}), 500
 
+@bill_split_bp.route('/groups/<int:group_id>/analytics', methods=['GET'], endpoint='get_group_analytics')
+@user_required()
+def get_group_analytics(current_user_id, group_id):
+    try:
+        group = Group.query.filter_by(id=group_id).first()
+        if not group or group.deleted_at is not None:
+            logger.warning(f"Group {group_id} not found or soft-deleted")
+            return jsonify({"error": "Group not found"}), 404
+
+        is_member = GroupMember.query.filter_by(group_id=group_id, user_id=current_user_id).first()
+        if not is_member and group.creator_id != current_user_id:
+            logger.warning(f"User {current_user_id} is not a member of group {group_id}")
+            return jsonify({"error": "You are not a member of this group"}), 403
+
+        currency = (request.args.get('currency') or group.currency or current_app.config['FX_REPORTING_CURRENCY']).upper()
+        analytics = cached_result(
+            f"splits:group:{group_id}",
+            {"currency": currency},
+            lambda: group_split_analytics(group_id, currency)
+        )
+        return jsonify({"analytics": analytics}), 200
+    except Exception as e:
+        logger.error(f"Exception in get_group_analytics: {str(e)}")
+        return jsonify({"error": f"Failed to fetch group analytics: {str(e)}"}), 500
+
 @bill_split_bp.route('/groups/<int:group_id>', methods=['PUT'], endpoint='update_group')
 @user_required()
 def update_group(current_user_id, group_id):
@@ -0,0 +1,145 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.budget import Budget
+from models.budget_alert import BudgetAlert
+from helpers.budgets import period_bounds, roll_budget, queue_budget_alerts, sweep_budget_alerts
+from db import db
+from datetime import date
+
+budget_bp = Blueprint('budget', __name__, cli_group='budgets')
+
+@budget_bp.route('', methods=['POST'])
+@jwt_required()
+def add_budget():
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        category = data.get('category')
+        limit = data.get('limit')
+        period = data.get('period', 'monthly')
+        alert_threshold = float(data.get('alert_threshold', 0.8))
+
+        if not category or limit is None:
+            return jsonify({"error": "Missing required fields: category and limit are mandatory"}), 400
+
+        if Budget.query.filter_by(user_id=user_id, category=category, period=period).first():
+            return jsonify({"error": "A budget for this category and period already exists"}), 409
+
+        start, _ = period_bounds(period, date.today())
+        budget = Budget(
+            user_id=user_id,
+            category=category,
+            limit=float(limit),
+            period=period,
+            period_start=start,
+            alert_threshold=alert_threshold
+        )
+        # Seed spend for the current period; afterwards it is maintained incrementally.
+        roll_budget(budget, force=True)
+        db.session.add(budget)
+        db.session.flush()
+        queue_budget_alerts([budget])
+        db.session.commit()
+
+        return jsonify({"message": "Budget added", "budget": budget.to_dict()}), 201
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to add budget: {str(e)}"}), 500
+
+@budget_bp.route('', methods=['GET'])
+@jwt_required()
+def get_budgets():
+    try:
+        user_id = get_jwt_identity()
+        budgets = Budget.query.filter_by(user_id=user_id).all()
+
+        rolled = [budget for budget in budgets if roll_budget(budget)]
+        if rolled:
+            queue_budget_alerts(rolled)
+            db.session.commit()
+
+        return jsonify([budget.to_dict() for budget in budgets]), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to fetch budgets: {str(e)}"}), 500
+
+@budget_bp.route('/<int:budget_id>', methods=['PUT'])
+@jwt_required()
+def update_budget(budget_id):
+    try:
+        user_id = get_jwt_identity()
+        budget = Budget.query.filter_by(id=budget_id, user_id=user_id).first()
+        if not budget:
+            return jsonify({"error": "Budget not found"}), 404
+
+        data = request.get_json()
+        limit = float(data.get('limit', budget.limit))
+        alert_threshold = float(data.get('alert_threshold', budget.alert_threshold))
+        budget.validate_inputs(budget.category, limit, budget.period, alert_threshold)
+        budget.limit = limit
+        budget.alert_threshold = alert_threshold
+
+        roll_budget(budget)
+        queue_budget_alerts([budget])
+        db.session.commit()
+        return jsonify({"message": "Budget updated", "budget": budget.to_dict()}), 200
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to update budget: {str(e)}"}), 500
+
+@budget_bp.route('/<int:budget_id>', methods=['DELETE'])
+@jwt_required()
+def delete_budget(budget_id):
+    try:
+        user_id = get_jwt_identity()
+        budget = Budget.query.filter_by(id=budget_id, user_id=user_id).first()
+        if not budget:
+            return jsonify({"error": "Budget not found"}), 404
+
+        BudgetAlert.query.filter_by(budget_id=budget.id).delete()
+        db.session.delete(budget)
+        db.session.commit()
+        return jsonify({"message": "Budget deleted"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to delete budget: {str(e)}"}), 500
+
+@budget_bp.route('/alerts', methods=['GET'])
+@jwt_required()
+def get_budget_alerts():
+    try:
+        user_id = get_jwt_identity()
+        alerts = BudgetAlert.query.filter_by(user_id=user_id, delivered=False).order_by(BudgetAlert.created_at.desc()).all()
+        return jsonify([alert.to_dict() for alert in alerts]), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch budget alerts: {str(e)}"}), 500
+
+@budget_bp.route('/alerts/ack', methods=['POST'])
+@jwt_required()
+def acknowledge_budget_alerts():
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        alert_ids = data.get('ids')
+
+        query = BudgetAlert.query.filter_by(user_id=user_id, delivered=False)
+        if alert_ids:
+            query = query.filter(BudgetAlert.id.in_([int(i) for i in alert_ids]))
+        updated = query.update({BudgetAlert.delivered: True}, synchronize_session=False)
+        db.session.commit()
+        return jsonify({"message": "Budget alerts acknowledged", "count": updated}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to acknowledge budget alerts: {str(e)}"}), 500
+
+@budget_bp.cli.command('sweep-alerts')
+def sweep_alerts_command():
+    """Roll budgets into the current period and queue threshold alerts."""
+    queued = sweep_budget_alerts()
+    print(f"Queued {queued} budget alerts")
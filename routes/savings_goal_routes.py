@@ -1,12 +1,22 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.savings_goal import SavingsGoal
+from models.savings_rollup import SavingsRollup
+from models.goal_contribution import GoalContribution
+from models.user_streak import UserStreak
+from models.user import User
+from models.goal_projection import GoalProjection
+from models.allocation_rule import AllocationRule
+from helpers.savings import record_contributions, rollup_period_start, effective_current_streak, previous_month_start, rebuild_streaks
+from helpers.cache import cached_result
+from helpers.utils import parse_report_params
+from helpers.projections import monthly_pace, compute_projections, invalidate_projections, store_projections, precompute_projections
 from db import db
-from datetime import datetime, date, timedelta
-from sqlalchemy import func, extract
+from datetime import datetime, date
+from sqlalchemy import func
 import calendar
 
-savings_goal_bp = Blueprint('savings_goal', __name__)
+savings_goal_bp = Blueprint('savings_goal', __name__, cli_group='goals')
 
 def get_next_goal_id():
     """Generate a unique goal ID by incrementing the max id."""
@@ -48,6 +58,7 @@ def add_savings_goal():
             user_id=user_id
         )
         db.session.add(new_goal)
+        record_contributions(user_id, [(new_goal.id, progress)])
         db.session.commit()
 
         return jsonify({"message": "Savings goal added", "goal": new_goal.to_dict()}), 201
@@ -78,12 +89,15 @@ def update_savings_goal(goal_id):
         data = request.get_json()
         goal.name = data.get('name', goal.name)
         goal.target = float(data.get('target', goal.target))
+        previous_progress = goal.progress
         goal.progress = float(data.get('progress', goal.progress))
+        record_contributions(user_id, [(goal.id, goal.progress - previous_progress)])
 
         deadline = data.get('deadline')
         if deadline:
             goal.deadline = datetime.strptime(deadline, '%Y-%m-%d').date()
 
+        invalidate_projections([goal.id])
         db.session.commit()
         return jsonify({"message": "Goal updated", "goal": goal.to_dict()}), 200
     except Exception as e:
@@ -99,6 +113,8 @@ def delete_savings_goal(goal_id):
         if not goal:
             return jsonify({"error": "Goal not found or unauthorized"}), 404
 
+        invalidate_projections([goal.id])
+        AllocationRule.query.filter_by(user_id=user_id, goal_id=goal.id).delete()
         db.session.delete(goal)
         db.session.commit()
         return jsonify({"message": "Goal deleted"}), 200
@@ -106,74 +122,186 @@ def delete_savings_goal(goal_id):
         db.session.rollback()
         return jsonify({"error": f"Failed to delete goal: {str(e)}"}), 500
 
-@savings_goal_bp.route('/goals/trends', methods=['GET'])
+@savings_goal_bp.route('/goals/allocation-rules', methods=['GET'])
 @jwt_required()
-def get_savings_trends():
+def get_allocation_rules():
     try:
         user_id = get_jwt_identity()
-        period = request.args.get('period', 'monthly')
+        rules = AllocationRule.query.filter_by(user_id=user_id).order_by(AllocationRule.priority, AllocationRule.id).all()
+        return jsonify([rule.to_dict() for rule in rules]), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch allocation rules: {str(e)}"}), 500
 
-        six_months_ago = datetime.now() - timedelta(days=180)
-
-        if period == 'weekly':
-            trends_data = db.session.query(
-                extract('year', SavingsGoal.deadline).label('year'),
-                extract('week', SavingsGoal.deadline).label('week'),
-                func.sum(SavingsGoal.progress).label('total_savings')
-            ).filter(
-                SavingsGoal.deadline >= six_months_ago,
-                SavingsGoal.user_id == user_id
-            ).group_by(
-                'year', 'week'
-            ).order_by(
-                'year', 'week'
-            ).all()
-            labels = [f'Week {week}' for year, week, _ in trends_data]
-            monthly_savings = [float(total) for _, _, total in trends_data]
-
-        elif period == 'yearly':
-            trends_data = db.session.query(
-                extract('year', SavingsGoal.deadline).label('year'),
-                func.sum(SavingsGoal.progress).label('total_savings')
-            ).filter(
-                SavingsGoal.user_id == user_id
-            ).group_by(
-                'year'
-            ).order_by(
-                'year'
-            ).all()
-            labels = [f'Year {year}' for year, _ in trends_data]
-            monthly_savings = [float(total) for _, total in trends_data]
-
-        else:  
-            trends_data = db.session.query(
-                extract('year', SavingsGoal.deadline).label('year'),
-                extract('month', SavingsGoal.deadline).label('month'),
-                func.sum(SavingsGoal.progress).label('total_savings')
-            ).filter(
-                SavingsGoal.deadline >= six_months_ago,
-                SavingsGoal.user_id == user_id
-            ).group_by(
-                'year', 'month'
-            ).order_by(
-                'year', 'month'
+@savings_goal_bp.route('/goals/allocation-rules', methods=['POST'])
+@jwt_required()
+def add_allocation_rule():
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        goal_id = data.get('goal_id')
+        kind = data.get('kind', 'percent')
+        value = data.get('value')
+
+        if goal_id is None or value is None:
+            return jsonify({"error": "Missing required fields: goal_id and value are mandatory"}), 400
+
+        if not SavingsGoal.query.filter_by(id=goal_id, user_id=user_id).first():
+            return jsonify({"error": "Goal not found or unauthorized"}), 404
+
+        rule = AllocationRule(
+            user_id=user_id,
+            goal_id=int(goal_id),
+            kind=kind,
+            value=float(value),
+            priority=int(data.get('priority', 0))
+        )
+        db.session.add(rule)
+        db.session.commit()
+        return jsonify({"message": "Allocation rule added", "rule": rule.to_dict()}), 201
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to add allocation rule: {str(e)}"}), 500
+
+@savings_goal_bp.route('/goals/allocation-rules/<int:rule_id>', methods=['PUT'])
+@jwt_required()
+def update_allocation_rule(rule_id):
+    try:
+        user_id = get_jwt_identity()
+        rule = AllocationRule.query.filter_by(id=rule_id, user_id=user_id).first()
+        if not rule:
+            return jsonify({"error": "Allocation rule not found"}), 404
+
+        data = request.get_json()
+        kind = data.get('kind', rule.kind)
+        value = float(data.get('value', rule.value))
+        priority = int(data.get('priority', rule.priority))
+        rule.validate_inputs(kind, value, priority)
+        rule.kind = kind
+        rule.value = value
+        rule.priority = priority
+
+        db.session.commit()
+        return jsonify({"message": "Allocation rule updated", "rule": rule.to_dict()}), 200
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to update allocation rule: {str(e)}"}), 500
+
+@savings_goal_bp.route('/goals/allocation-rules/<int:rule_id>', methods=['DELETE'])
+@jwt_required()
+def delete_allocation_rule(rule_id):
+    try:
+        user_id = get_jwt_identity()
+        rule = AllocationRule.query.filter_by(id=rule_id, user_id=user_id).first()
+        if not rule:
+            return jsonify({"error": "Allocation rule not found"}), 404
+
+        db.session.delete(rule)
+        db.session.commit()
+        return jsonify({"message": "Allocation rule deleted"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to delete allocation rule: {str(e)}"}), 500
+
+@savings_goal_bp.route('/goals/projections', methods=['GET'])
+@jwt_required()
+def get_goal_projections():
+    try:
+        user_id = get_jwt_identity()
+        today = date.today()
+        goals = SavingsGoal.query.filter_by(user_id=user_id).all()
+        goal_ids = [goal.id for goal in goals]
+
+        cached = {
+            projection.goal_id: projection
+            for projection in GoalProjection.query.filter(
+                GoalProjection.goal_id.in_(goal_ids),
+                GoalProjection.computed_on == today
             ).all()
-            labels = [f"{calendar.month_abbr[month]} {year}" for year, month, _ in trends_data]
-            monthly_savings = [float(total) for _, _, total in trends_data]
+        } if goal_ids else {}
+
+        stale = [goal for goal in goals if goal.id not in cached]
+        if stale:
+            stale_ids = [goal.id for goal in stale]
+            fresh = compute_projections(stale, monthly_pace(stale_ids, today), today)
+            invalidate_projections(stale_ids)
+            store_projections(fresh)
+            cached.update({projection.goal_id: projection for projection in fresh})
 
-        total_savings = sum(monthly_savings)
-        monthly_avg = total_savings / len(monthly_savings) if monthly_savings else 0
-        highest_month = labels[monthly_savings.index(max(monthly_savings))] if monthly_savings else ''
+        # Serialize before committing so expire_on_commit doesn't reload every goal.
+        projections = []
+        for goal in goals:
+            projection = cached[goal.id].to_dict()
+            projection.update({"name": goal.name, "target": goal.target, "progress": goal.progress, "deadline": goal.deadline.strftime('%Y-%m-%d')})
+            projections.append(projection)
+        if stale:
+            db.session.commit()
+        return jsonify(projections), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to fetch goal projections: {str(e)}"}), 500
+
+GRANULARITY_PERIODS = {'week': 'weekly', 'month': 'monthly', 'year': 'yearly'}
+
+def savings_trends(user_id, period, date_from=None, date_to=None):
+    """Build the trends payload from the user's pre-aggregated savings rollups."""
+    filters = [SavingsRollup.user_id == user_id, SavingsRollup.period == period]
+    if date_from:
+        filters.append(SavingsRollup.period_start >= rollup_period_start(period, date_from))
+    if date_to:
+        filters.append(SavingsRollup.period_start <= date_to)
+    rows = SavingsRollup.query.filter(*filters).order_by(SavingsRollup.period_start).all()
 
-        trends_data = {
-            "total_savings": total_savings,
-            "monthly_avg": monthly_avg,
-            "highest_month": highest_month,
-            "monthly_data": monthly_savings,
-            "labels": labels
-        }
+    if period == 'weekly':
+        labels = [f"Week {row.period_start.isocalendar()[1]}" for row in rows]
+    elif period == 'yearly':
+        labels = [f"Year {row.period_start.year}" for row in rows]
+    else:
+        labels = [f"{calendar.month_abbr[row.period_start.month]} {row.period_start.year}" for row in rows]
+    monthly_savings = [float(row.total) for row in rows]
 
+    total_savings = sum(monthly_savings)
+    monthly_avg = total_savings / len(monthly_savings) if monthly_savings else 0
+    highest_month = labels[monthly_savings.index(max(monthly_savings))] if monthly_savings else ''
+
+    return {
+        "total_savings": total_savings,
+        "monthly_avg": monthly_avg,
+        "highest_month": highest_month,
+        "monthly_data": monthly_savings,
+        "labels": labels
+    }
+
+@savings_goal_bp.route('/goals/trends', methods=['GET'])
+@jwt_required()
+def get_savings_trends():
+    try:
+        user_id = get_jwt_identity()
+        period = request.args.get('period', 'monthly')
+        date_from, date_to, granularity = parse_report_params(request.args, default_days=180)
+
+        if granularity:
+            if granularity not in GRANULARITY_PERIODS:
+                return jsonify({"error": "Invalid granularity. Use: week, month, year"}), 400
+            period = GRANULARITY_PERIODS[granularity]
+        if period not in GRANULARITY_PERIODS.values():
+            period = 'monthly'
+        if period == 'yearly' and not request.args.get('from'):
+            date_from = None
+
+        trends_data = cached_result(
+            f"goals:{user_id}",
+            {"trends": period, "from": date_from, "to": date_to},
+            lambda: savings_trends(user_id, period, date_from, date_to)
+        )
         return jsonify(trends_data), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to fetch trends: {str(e)}"}), 500
 
@@ -192,23 +320,66 @@ def get_total_target():
 def get_savings_streak():
     try:
         user_id = get_jwt_identity()
-        goals = SavingsGoal.query.filter_by(user_id=user_id).order_by(SavingsGoal.deadline).all()
+        streak = db.session.get(UserStreak, user_id)
+        if not streak:
+            return jsonify({"streak": 0, "current_streak": 0, "longest_streak": 0, "last_active_period": None}), 200
 
-        streak = 0
-        current_streak = 0
-        previous_month = None
+        streak_data = streak.to_dict(current_streak=effective_current_streak(streak))
+        streak_data["streak"] = streak.longest_streak
+        return jsonify(streak_data), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch streak: {str(e)}"}), 500
 
-        for goal in goals:
-            goal_month = goal.deadline.strftime('%Y-%m')
-            if goal.progress > 0:
-                if goal_month != previous_month:
-                    current_streak += 1
-                    previous_month = goal_month
-                streak = max(streak, current_streak)
-            else:
-                current_streak = 0
-                previous_month = None
-
-        return jsonify({"streak": streak}), 200
+@savings_goal_bp.route('/goals/streak/leaderboard', methods=['GET'])
+@jwt_required()
+def get_streak_leaderboard():
+    try:
+        board = request.args.get('board', 'current')
+        limit = min(request.args.get('limit', 10, type=int), 100)
+
+        query = db.session.query(UserStreak, User.name).join(User, User.id == UserStreak.user_id)
+        if board == 'longest':
+            query = query.order_by(UserStreak.longest_streak.desc())
+        else:
+            active_since = previous_month_start(date.today().replace(day=1))
+            query = query.filter(
+                UserStreak.last_active_period >= active_since
+            ).order_by(UserStreak.current_streak.desc())
+
+        leaderboard = []
+        for rank, (streak, name) in enumerate(query.limit(limit).all(), start=1):
+            entry = streak.to_dict(current_streak=effective_current_streak(streak))
+            entry["rank"] = rank
+            entry["name"] = name
+            leaderboard.append(entry)
+        return jsonify({"board": board, "leaderboard": leaderboard}), 200
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch streak: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Failed to fetch streak leaderboard: {str(e)}"}), 500
+
+@savings_goal_bp.cli.command('backfill-contributions')
+def backfill_contributions_command():
+    """Seed contribution history for goals saved before it was tracked.
+
+    The seeded rows are marked backfilled so they stay out of trends and streaks.
+    """
+    tracked = {goal_id for (goal_id,) in db.session.query(GoalContribution.goal_id).distinct()}
+    goals = SavingsGoal.query.filter(SavingsGoal.progress > 0).all()
+    seeded = 0
+    for goal in goals:
+        if goal.id not in tracked and goal.user_id:
+            record_contributions(goal.user_id, [(goal.id, goal.progress)], backfilled=True)
+            seeded += 1
+    db.session.commit()
+    print(f"Seeded contribution history for {seeded} goals")
+
+@savings_goal_bp.cli.command('rebuild-streaks')
+def rebuild_streaks_command():
+    """Recompute stored savings streaks from contribution history."""
+    count = rebuild_streaks()
+    print(f"Rebuilt savings streaks for {count} users")
+
+@savings_goal_bp.cli.command('precompute-projections')
+def precompute_projections_command():
+    """Recompute goal projections for all users."""
+    count = precompute_projections()
+    print(f"Computed projections for {count} goals")
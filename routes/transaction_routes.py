@@ -4,7 +4,12 @@ from models.transaction import Transaction
 from models.user import User
 from db import db
 from routes.admin_routes import admin_required
-from datetime import datetime, timedelta
+from helpers.budgets import expense_snapshot, apply_expense_change, queue_budget_alerts
+from helpers.allocations import apply_income_allocations
+from helpers.analytics_cube import transaction_fact, apply_fact_change
+from helpers.cache import cached_result, invalidate_on_commit
+from helpers.insights import INSIGHT_PERIODS, spending_insights
+from datetime import date, datetime, timedelta
 
 transaction_bp = Blueprint('transaction', __name__)
 
@@ -13,6 +18,18 @@ def get_next_transaction_id():
     max_id = db.session.query(db.func.max(Transaction.id)).scalar()
     return (max_id or 0) + 1
 
+def snapshot_transaction(transaction):
+    """Capture what derived aggregates know about a transaction before it changes."""
+    return expense_snapshot(transaction), transaction_fact(transaction)
+
+def apply_transaction_change(user_id, before, after):
+    """Bring budgets and the analytics cube in line with a transaction change."""
+    before_expense, before_fact = before or (None, None)
+    after_expense, after_fact = after or (None, None)
+    queue_budget_alerts(apply_expense_change(user_id, before_expense, after_expense))
+    apply_fact_change(before_fact, after_fact)
+    invalidate_on_commit(f"transactions:{user_id}")
+
 @transaction_bp.route('/income', methods=['POST'])
 @jwt_required()
 def add_income():
@@ -40,9 +57,15 @@ def add_income():
             flagged=data.get('flagged', False)
         )
         db.session.add(new_transaction)
+        apply_transaction_change(user_id, None, snapshot_transaction(new_transaction))
+        allocations = apply_income_allocations(user_id, float(amount)) if data.get('allocate', True) else {}
         db.session.commit()
 
-        return jsonify({"message": "Income transaction added successfully", "transaction": new_transaction.to_dict()}), 201
+        return jsonify({
+            "message": "Income transaction added successfully",
+            "transaction": new_transaction.to_dict(),
+            "allocations": [{"goal_id": goal_id, "amount": allocated} for goal_id, allocated in allocations.items()]
+        }), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to add income transaction: {str(e)}"}), 500
@@ -74,6 +97,7 @@ def add_expense():
             flagged=data.get('flagged', False)
         )
         db.session.add(new_transaction)
+        apply_transaction_change(user_id, None, snapshot_transaction(new_transaction))
         db.session.commit()
 
         return jsonify({"message": "Expense transaction added successfully", "transaction": new_transaction.to_dict()}), 201
@@ -92,6 +116,25 @@ def get_all_transactions():
     except Exception as e:
         return jsonify({"error": f"Failed to fetch transactions: {str(e)}"}), 500
 
+@transaction_bp.route('/insights', methods=['GET'])
+@jwt_required()
+def get_spending_insights():
+    try:
+        user_id = get_jwt_identity()
+        period = request.args.get('period', 'month')
+        if period not in INSIGHT_PERIODS:
+            return jsonify({"error": f"Invalid period. Use: {', '.join(INSIGHT_PERIODS)}"}), 400
+
+        today = date.today()
+        insights = cached_result(
+            f"transactions:{user_id}",
+            {"period": period, "today": today},
+            lambda: spending_insights(user_id, period, today)
+        )
+        return jsonify(insights), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch spending insights: {str(e)}"}), 500
+
 @transaction_bp.route('/<int:transaction_id>', methods=['GET'])
 @jwt_required()
 def get_transaction(transaction_id):
@@ -115,6 +158,7 @@ def update_transaction(transaction_id):
         if not transaction:
             return jsonify({"error": "Transaction not found"}), 404
 
+        before = snapshot_transaction(transaction)
         if 'amount' in data:
             transaction.amount = data['amount']
         if 'category' in data:
@@ -130,6 +174,7 @@ def update_transaction(transaction_id):
         if 'flagged' in data:
             transaction.flagged = data.get('flagged', False)
 
+        apply_transaction_change(user_id, before, snapshot_transaction(transaction))
         db.session.commit()
 
         return jsonify({"message": "Transaction updated", "transaction": transaction.to_dict()}), 200
@@ -146,7 +191,9 @@ def delete_transaction(transaction_id):
         if not transaction:
             return jsonify({"error": "Transaction not found"}), 404
 
+        before = snapshot_transaction(transaction)
         db.session.delete(transaction)
+        apply_transaction_change(user_id, before, None)
         db.session.commit()
 
         return jsonify({"message": "Transaction deleted successfully"}), 200
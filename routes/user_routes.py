@@ -1,11 +1,12 @@
-from flask import Blueprint, request, jsonify, current_app
-from models.user import User, save_profile_picture
+from flask import Blueprint, request, jsonify, current_app, url_for
+from models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from db import db
-import os
-from werkzeug.utils import secure_filename
-from werkzeug.security import check_password_hash, generate_password_hash
 from helpers.utils import is_strong_password
+from helpers.rate_limit import rate_limit
+from helpers.passwords import hash_password
+from helpers.images import save_upload, submit_thumbnails, thumbnail_url
+from helpers.analytics_cube import move_profession_facts
 
 user_bp = Blueprint('user', __name__)
 
@@ -34,16 +35,20 @@ def upload_profile_picture():
     if file.filename == '':
         return jsonify({"success": False, "message": "No selected file."}), 400
 
-    file_path = save_profile_picture(file)
-    if not file_path:
+    try:
+        _, filename = save_upload(file, current_app.config['UPLOAD_FOLDER'], current_app.config['MAX_UPLOAD_BYTES'])
+    except ValueError as ve:
+        return jsonify({"success": False, "message": str(ve)}), 400
+    except OSError:
         return jsonify({"success": False, "message": "Failed to save file."}), 500
+    submit_thumbnails(current_app._get_current_object(), filename)
 
-    file_url = f"{request.host_url}uploads/{os.path.basename(file_path)}"
+    file_url = url_for('uploaded_file', filename=filename, _external=True)
     
     user.profile_picture = file_url
     db.session.commit()
 
-    return jsonify({"success": True, "url": file_url}), 200
+    return jsonify({"success": True, "url": file_url, "thumbnail": thumbnail_url(file_url, 128)}), 200
 
 @user_bp.route('', methods=['PUT'])
 @jwt_required()
@@ -62,6 +67,7 @@ def update_user():
     if 'email' in data:
         user.email = data['email'].strip().lower()
     if 'profession' in data:  
+        move_profession_facts(user.id, user.profession, data['profession'])
         user.profession = data['profession']
 
     db.session.commit()
@@ -69,6 +75,7 @@ def update_user():
 
 @user_bp.route('/search', methods=['GET'])
 @jwt_required()
+@rate_limit('user-search', user='60/minute', ip='120/minute')
 def search_users():
     query_id = request.args.get('id', type=str)
     if not query_id:
@@ -103,7 +110,7 @@ def change_password():
     if not current_password or not new_password:
         return jsonify({"success": False, "message": "Current and new passwords are required."}), 400
 
-    if not check_password_hash(user.password, current_password):
+    if not user.check_password(current_password):
         return jsonify({"success": False, "message": "Incorrect current password."}), 401
 
     if not is_strong_password(new_password):
@@ -112,7 +119,7 @@ def change_password():
             "message": "New password must be at least 8 characters long, contain an uppercase letter, and a number."
         }), 400
 
-    user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+    user.password = hash_password(new_password)
     db.session.commit()
 
     return jsonify({"success": True, "message": "Password changed successfully."}), 200
\ No newline at end of file
@@ -0,0 +1,18 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.py reads these at import time; tests run against in-memory SQLite with cheap hashing.
+os.environ.setdefault('DATABASE_URI', 'sqlite://')
+os.environ.setdefault('PASSWORD_HASH_ALGORITHM', 'pbkdf2')
+os.environ.setdefault('PBKDF2_ITERATIONS', '1000')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+@compiles(BigInteger, 'sqlite')
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY; MySQL's BIGINT ids need the same behaviour here.
+    return 'INTEGER'
@@ -0,0 +1,150 @@
+from datetime import date, datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from db import db
+from models.user import User
+from models.user_activity import UserActivity
+from models.budget import Budget
+from models.budget_alert import BudgetAlert
+from models.goal_contribution import GoalContribution
+from models.savings_rollup import SavingsRollup
+from models.user_streak import UserStreak
+from models.goal_projection import GoalProjection
+from models.allocation_rule import AllocationRule
+from models.export_job import ExportJob
+from models.bill_split import BillSplit
+
+@pytest.fixture
+def app():
+    app = create_app(migrations=False)
+    with app.app_context():
+        db.create_all()
+        # SQLite only enforces foreign keys when asked; MySQL always does.
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql('PRAGMA foreign_keys=ON')
+        yield app
+        app.extensions['write_behind'].flush()
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def admin_headers(app):
+    admin = User(name='Admin', email='admin@example.com', profession='Ops', password='Password123', is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+    return {'Authorization': f"Bearer {create_access_token(identity=admin.id)}"}
+
+def add_user(email):
+    user = User(name='Member', email=email, profession='Dev', password='Password123')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def test_delete_user_with_activity(app, admin_headers):
+    user_id = add_user('member@example.com')
+    now = datetime.utcnow()
+    db.session.add(UserActivity(user_id=user_id, day=date.today(), first_seen_at=now, last_seen_at=now))
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert db.session.get(User, user_id) is None
+    assert UserActivity.query.filter_by(user_id=user_id).count() == 0
+
+def test_delete_user_with_budgets(app, admin_headers):
+    user_id = add_user('member@example.com')
+    budget = Budget(user_id=user_id, category='Food', limit=100.0, period_start=date.today().replace(day=1))
+    db.session.add(budget)
+    db.session.flush()
+    db.session.add(BudgetAlert(
+        budget_id=budget.id, user_id=user_id, category='Food', level='warning',
+        spent=90.0, limit=100.0, period_start=budget.period_start
+    ))
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert Budget.query.filter_by(user_id=user_id).count() == 0
+    assert BudgetAlert.query.filter_by(user_id=user_id).count() == 0
+
+def test_delete_missing_user(app, admin_headers):
+    response = app.test_client().delete('/api/admin/users/1', headers=admin_headers)
+    assert response.status_code == 404
+
+def test_delete_user_with_savings_history(app, admin_headers):
+    user_id = add_user('member@example.com')
+    db.session.add(GoalContribution(id=1, goal_id=1, user_id=user_id, amount=25.0))
+    db.session.add(SavingsRollup(id=1, user_id=user_id, period='monthly', period_start=date.today().replace(day=1), total=25.0, contribution_count=1))
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert GoalContribution.query.filter_by(user_id=user_id).count() == 0
+    assert SavingsRollup.query.filter_by(user_id=user_id).count() == 0
+
+def test_delete_user_with_streak(app, admin_headers):
+    user_id = add_user('member@example.com')
+    db.session.add(UserStreak(user_id=user_id, current_streak=2, longest_streak=3, last_active_period=date.today()))
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert db.session.get(UserStreak, user_id) is None
+
+def test_delete_user_with_goal_projection(app, admin_headers):
+    user_id = add_user('member@example.com')
+    db.session.add(GoalProjection(goal_id=1, user_id=user_id, required_monthly=50.0, monthly_pace=40.0, status='behind', computed_on=date.today()))
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert GoalProjection.query.filter_by(user_id=user_id).count() == 0
+
+def test_delete_user_with_allocation_rule(app, admin_headers):
+    user_id = add_user('member@example.com')
+    db.session.add(AllocationRule(user_id=user_id, goal_id=1, kind='percent', value=10.0))
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert AllocationRule.query.filter_by(user_id=user_id).count() == 0
+
+def test_delete_user_with_export_job(app, admin_headers):
+    user_id = add_user('member@example.com')
+    db.session.add(ExportJob(id='job1', created_by=user_id, report_type='transactions', format='csv', date_from=date.today()))
+    db.session.commit()
+
+    response = app.test_client().delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    assert ExportJob.query.filter_by(created_by=user_id).count() == 0
+
+def test_moderation_queue_orders_by_stored_risk(app, admin_headers):
+    user_id = add_user('member@example.com')
+    amounts = [10.0, 30.0, 20.0, 200.0]
+    db.session.add_all([
+        BillSplit(id=index + 1, name='Dinner', total_amount=amount, creator_id=user_id, category='Food', currency='INR')
+        for index, amount in enumerate(amounts)
+    ])
+    db.session.commit()
+    client = app.test_client()
+
+    response = client.patch('/api/admin/bill_splits/flag', json={"ids": [2, 4], "flagged": True}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 2
+    response = client.patch('/api/admin/bill_splits/1/flag', json={"flagged": True}, headers=admin_headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/admin/bill_splits/moderation', headers=admin_headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["total"] == 3
+    assert [(split["id"], split["risk_score"]) for split in body["bill_splits"]] == [(4, 3.08), (2, 0.46), (1, 0.15)]
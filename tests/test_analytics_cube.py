@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import event
+from app import create_app
+from db import db
+from helpers.analytics_cube import rebuild_cube, upsert_facts
+from models.analytics_daily_fact import AnalyticsDailyFact
+from models.transaction import Transaction
+from models.user import User
+
+@pytest.fixture
+def app():
+    app = create_app(migrations=False)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def cube():
+    return {
+        (row.day, row.type, row.category, row.profession): (row.total_amount, row.txn_count)
+        for row in AnalyticsDailyFact.query.all()
+    }
+
+def test_rebuild_rewrites_existing_cells(app):
+    user = User(name='Member', email='member@example.com', profession='Dev', password='Password123')
+    db.session.add(user)
+    db.session.flush()
+    today = date.today()
+    db.session.add_all([
+        Transaction(id=1, amount=10.0, category='Food', account='Cash', note=None, date=today, type='expense', user_id=user.id),
+        Transaction(id=2, amount=5.0, category='Food', account='Cash', note=None, date=today, type='expense', user_id=user.id),
+    ])
+    upsert_facts({
+        (today, 'expense', 'Food', 'Dev'): (99.0, 7),
+        (today, 'expense', 'Rent', 'Dev'): (50.0, 1),
+        (today - timedelta(days=400), 'income', 'Salary', 'Dev'): (1000.0, 1),
+    })
+    db.session.commit()
+
+    assert rebuild_cube() == 1
+    assert cube() == {(today, 'expense', 'Food', 'Dev'): (15.0, 2)}
+
+    upsert_facts({(today, 'expense', 'Food', 'Dev'): (1.0, 1)})
+    db.session.commit()
+    assert cube() == {(today, 'expense', 'Food', 'Dev'): (16.0, 3)}
+
+def test_rebuild_keeps_unrebuilt_windows_readable(app):
+    user = User(name='Member', email='member@example.com', profession='Dev', password='Password123')
+    db.session.add(user)
+    db.session.flush()
+    today = date.today()
+    for offset in range(3):
+        day = today - timedelta(days=offset)
+        db.session.add(Transaction(id=offset, amount=10.0, category='Food', account='Cash', note=None, date=day, type='expense', user_id=user.id))
+        upsert_facts({(day, 'expense', 'Food', 'Dev'): (10.0, 1)})
+    db.session.commit()
+
+    seen = []
+    def count_cells(session):
+        with db.engine.connect() as conn:
+            seen.append(conn.execute(db.select(db.func.count()).select_from(AnalyticsDailyFact)).scalar())
+    event.listen(db.session, 'after_commit', count_cells)
+    try:
+        rebuild_cube(window_days=1)
+    finally:
+        event.remove(db.session, 'after_commit', count_cells)
+
+    assert seen and all(count == 3 for count in seen)
+
+def test_rebuild_without_data_empties_cube(app):
+    upsert_facts({(date.today(), 'expense', 'Food', ''): (10.0, 1)})
+    db.session.commit()
+
+    assert rebuild_cube() == 0
+    assert cube() == {}
@@ -0,0 +1,117 @@
+import pytest
+from flask import Flask
+from helpers.rate_limit import MemoryBucketStore, parse_limit, rate_limit
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def store(clock):
+    return MemoryBucketStore(clock=clock)
+
+@pytest.fixture
+def app(store):
+    app = Flask(__name__)
+    app.config.update(RATE_LIMIT_ENABLED=True, RATE_LIMIT_PROXY_HOPS=0)
+    app.extensions['rate_limiter'] = store
+
+    @app.route('/login', methods=['POST'])
+    @rate_limit('login', ip='10/minute', email='2/minute')
+    def login():
+        return {"success": True}
+
+    return app
+
+def test_parse_limit():
+    assert parse_limit('5/minute') == (5, 5 / 60)
+    assert parse_limit('10/15 minutes') == (10, 10 / 900)
+
+def test_burst_up_to_capacity_then_reject(store):
+    for _ in range(3):
+        assert store.take('k', 3, 1) == 0
+    assert store.take('k', 3, 1) == pytest.approx(1)
+
+def test_refill_over_time(store, clock):
+    for _ in range(3):
+        store.take('k', 3, 0.5)
+    clock.advance(1)
+    assert store.take('k', 3, 0.5) == pytest.approx(1)
+    clock.advance(1)
+    assert store.take('k', 3, 0.5) == 0
+
+def test_refill_is_capped_at_capacity(store, clock):
+    store.take('k', 2, 1)
+    clock.advance(3600)
+    assert store.take('k', 2, 1) == 0
+    assert store.take('k', 2, 1) == 0
+    assert store.take('k', 2, 1) > 0
+
+def test_rejected_take_does_not_spend(store, clock):
+    store.take('k', 1, 1)
+    assert store.take('k', 1, 1) == pytest.approx(1)
+    clock.advance(1)
+    assert store.take('k', 1, 1) == 0
+
+def test_take_many_charges_no_bucket_when_one_rejects(store):
+    store.take('tight', 1, 1)
+    assert store.take_many([('loose', 5, 1), ('tight', 1, 1)]) == pytest.approx(1)
+    for _ in range(5):
+        assert store.take('loose', 5, 1) == 0
+
+def test_take_many_reports_longest_wait(store):
+    store.take('a', 1, 1)
+    store.take('b', 1, 0.25)
+    assert store.take_many([('a', 1, 1), ('b', 1, 0.25)]) == pytest.approx(4)
+
+def test_evicts_least_recently_used_keys(clock):
+    store = MemoryBucketStore(max_keys=2, clock=clock)
+    store.take('a', 1, 1)
+    store.take('b', 1, 1)
+    store.take('c', 1, 1)
+    assert store.take('a', 1, 1) == 0
+
+def test_decorator_returns_429_with_retry_after(app, clock):
+    client = app.test_client()
+    for _ in range(2):
+        assert client.post('/login', json={"email": "a@example.com"}).status_code == 200
+    response = client.post('/login', json={"email": "a@example.com"})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '30'
+    assert response.get_json()['retry_after'] == 30
+
+    clock.advance(30)
+    assert client.post('/login', json={"email": "a@example.com"}).status_code == 200
+
+def test_decorator_does_not_charge_other_buckets_on_reject(app, store):
+    client = app.test_client()
+    for _ in range(2):
+        client.post('/login', json={"email": "a@example.com"})
+    for _ in range(5):
+        assert client.post('/login', json={"email": "a@example.com"}).status_code == 429
+    # The rejected attempts left the IP bucket with 8 of its 10 tokens.
+    for i in range(8):
+        assert client.post('/login', json={"email": f"user{i}@example.com"}).status_code == 200
+    assert client.post('/login', json={"email": "user8@example.com"}).status_code == 429
+
+def test_decorator_skips_keys_without_identity(app):
+    client = app.test_client()
+    for _ in range(10):
+        assert client.post('/login', json={}).status_code == 200
+    assert client.post('/login', json={}).status_code == 429
+
+def test_disabled_limiter_allows_everything(app):
+    app.config['RATE_LIMIT_ENABLED'] = False
+    client = app.test_client()
+    for _ in range(20):
+        assert client.post('/login', json={"email": "a@example.com"}).status_code == 200